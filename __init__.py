@@ -29,6 +29,7 @@ from bpy.types import PropertyGroup
 
 # Import addon modules
 from . import (
+    baron_hash_parser,
     mapgeo_parser,
     import_mapgeo,
     export_mapgeo,
@@ -87,8 +88,7 @@ def update_environment_visibility(self, context):
                 # Use dragon layers from baron hash (OVERRIDE mode)
                 # ParentMode applies here too (mode 3 = NOT visible on listed layers)
                 try:
-                    import ast
-                    dragon_layers = ast.literal_eval(obj["baron_dragon_layers_decoded"])
+                    dragon_layers = baron_hash_parser.parse_layer_list(obj["baron_dragon_layers_decoded"])
                     parent_mode = obj.get("baron_parent_mode", 1)
                     
                     if len(dragon_layers) > 0:
@@ -126,11 +126,15 @@ def update_environment_visibility(self, context):
             # STEP 2: Check baron pit state
             baron_visible = True  # Default: visible on all baron states
             
-            if has_baron_hash and "baron_layers_decoded" in obj:
+            if has_baron_hash and "baron_layers_mask" in obj:
+                # baron_layers_mask is the OR of the baron bits (Setup Wizard)
+                is_in_list = bool(obj["baron_layers_mask"] & current_baron_bit)
+                parent_mode = obj.get("baron_parent_mode", 1)
+                baron_visible = not is_in_list if parent_mode == 3 else is_in_list
+            elif has_baron_hash and "baron_layers_decoded" in obj:
                 # baron_layers_decoded contains bit values (1, 2, 4, 8, etc.)
                 try:
-                    import ast
-                    baron_layers = ast.literal_eval(obj["baron_layers_decoded"])
+                    baron_layers = baron_hash_parser.parse_layer_list(obj["baron_layers_decoded"])
                     parent_mode = obj.get("baron_parent_mode", 1)  # Default to Visible mode
                     
                     # Check if current baron bit is in the list
@@ -305,6 +309,12 @@ class MapgeoSettings(PropertyGroup):
     layers: CollectionProperty(type=MapgeoLayerItem)
     active_layer_index: IntProperty(default=0)
     
+    show_properties_details: BoolProperty(
+        name="Show Details",
+        description="Show decoded Baron and Dragon layer details in the Mesh Properties section",
+        default=False
+    )
+    
     # File paths
     last_import_path: StringProperty(
         name="Last Import Path",
@@ -416,10 +426,6 @@ classes = (
     ui_panel.MAPGEO_OT_toggle_bucket_grid_selectable,
     ui_panel.MAPGEO_OT_create_bucket_grid,
     ui_panel.VIEW3D_PT_mapgeo_panel,
-    ui_panel.VIEW3D_PT_mapgeo_layers_panel,
-    ui_panel.VIEW3D_PT_mapgeo_import_panel,
-    ui_panel.VIEW3D_PT_mapgeo_export_panel,
-    ui_panel.VIEW3D_PT_mapgeo_properties_panel,
 )
 
 def menu_func_import(self, context):
@@ -433,11 +439,24 @@ def menu_func_export(self, context):
 def register():
     """Register all addon classes and handlers"""
     for cls in classes:
-        bpy.utils.register_class(cls)
+        # Skip classes left registered by a partial reload
+        if not cls.is_registered:
+            bpy.utils.register_class(cls)
     
     # Register properties
     bpy.types.Scene.mapgeo_settings = bpy.props.PointerProperty(type=MapgeoSettings)
     
+    # Invalidate the cached material enum and panel counts when the scene changes
+    bpy.app.handlers.depsgraph_update_post.append(ui_panel.invalidate_material_items)
+    bpy.app.handlers.load_post.append(ui_panel.invalidate_material_items)
+    bpy.app.handlers.depsgraph_update_post.append(ui_panel.invalidate_scene_counts)
+    bpy.app.handlers.load_post.append(ui_panel.invalidate_scene_counts)
+    
+    # Drop cached material/collection lookups before another file is loaded
+    # and after undo/redo, which invalidate every ID reference
+    for handlers in (bpy.app.handlers.load_pre, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        handlers.append(utils.clear_data_caches)
+    
     # Add menu entries
     bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
     bpy.types.TOPBAR_MT_file_export.append(menu_func_export)
@@ -450,12 +469,25 @@ def unregister():
     bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
     bpy.types.TOPBAR_MT_file_export.remove(menu_func_export)
     
+    # Remove handlers
+    for handlers in (bpy.app.handlers.depsgraph_update_post, bpy.app.handlers.load_post):
+        for handler in (ui_panel.invalidate_material_items, ui_panel.invalidate_scene_counts):
+            if handler in handlers:
+                handlers.remove(handler)
+    for handlers in (bpy.app.handlers.load_pre, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if utils.clear_data_caches in handlers:
+            handlers.remove(utils.clear_data_caches)
+    
     # Unregister properties
     del bpy.types.Scene.mapgeo_settings
     
     # Unregister classes (in reverse order)
     for cls in reversed(classes):
-        bpy.utils.unregister_class(cls)
+        if cls.is_registered:
+            bpy.utils.unregister_class(cls)
+    
+    ui_panel.clear_caches()
+    utils.clear_data_caches()
     
     print("Rey's Mapgeo Blender Addon unregistered")
 
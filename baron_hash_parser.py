@@ -357,3 +357,17 @@ def get_dragon_layer_name(layer_bit):
         128: "Void"
     }
     return names.get(layer_bit, f"Unknown ({layer_bit})")
+
+
+def format_layer_list(layer_bits):
+    """Serialize layer bit values for storage on an object, e.g. "1,4" """
+    return ",".join(map(str, sorted(layer_bits)))
+
+
+def parse_layer_list(raw):
+    """Parse a stored layer list back into a list of ints
+
+    Accepts the "1,4" form written by format_layer_list as well as the
+    legacy "[1, 4]" form written by older versions of the importer.
+    """
+    return [int(x) for x in raw.strip("[]").split(",") if x.strip()]
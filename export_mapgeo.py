@@ -11,6 +11,7 @@ from mathutils import Vector, Matrix
 import struct
 import os
 import json
+import numpy as np
 
 from . import mapgeo_parser
 from . import utils
@@ -773,11 +774,26 @@ class EXPORT_SCENE_OT_mapgeo(bpy.types.Operator, ExportHelper):
             else:
                 print(f"WARNING: Non-triangle face in bucket grid {obj.name}")
         
-        # Reconstruct bucket data from stored JSON
-        bucket_data_json = obj.get("bucket_data")
-        if bucket_data_json:
+        # Reconstruct bucket data from the packed arrays, or from the per-object
+        # JSON bucket_data that custom grids stored before packed arrays existed
+        bucket_data = None
+        try:
+            bucket_data = _read_packed_bucket_data(obj)
+            if bucket_data is None:
+                bucket_data_json = obj.get("bucket_data")
+                if bucket_data_json:
+                    bucket_data = json.loads(bucket_data_json)
+        except ValueError as e:
+            self.report({'WARNING'}, f"Skipping bucket grid with invalid bucket data: {e}")
+            return None
+        except Exception as e:
+            print(f"Failed to parse bucket data from {obj.name}: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return None
+        
+        if bucket_data:
             try:
-                bucket_data = json.loads(bucket_data_json)
                 grid.buckets = []
                 
                 for row_data in bucket_data:
@@ -813,6 +829,44 @@ class EXPORT_SCENE_OT_mapgeo(bpy.types.Operator, ExportHelper):
         return grid
 
 
+_PACKED_BUCKET_FIELDS = (
+    ('base_vertex', "bucket_data_base_vertex"),
+    ('start_index', "bucket_data_start_index"),
+    ('inside_face_count', "bucket_data_inside_count"),
+    ('sticking_out_face_count', "bucket_data_sticking_count"),
+)
+
+
+def _read_packed_bucket_data(obj):
+    """Rebuild bucket rows from the packed int32 arrays written by Create Bucket Grid.
+    
+    Returns None when the object has no packed bucket data. Raises ValueError
+    when a field is missing or its length doesn't match buckets_per_side.
+    """
+    if "bucket_data_base_vertex" not in obj:
+        return None
+    
+    buckets_per_side = int(obj.get("buckets_per_side", 0))
+    expected_size = buckets_per_side * buckets_per_side * 4
+    columns = []
+    for _, prop_name in _PACKED_BUCKET_FIELDS:
+        if prop_name not in obj:
+            raise ValueError(f"{obj.name}: missing {prop_name}")
+        raw = bytes(obj[prop_name])
+        if len(raw) != expected_size:
+            raise ValueError(
+                f"{obj.name}: {prop_name} holds {len(raw) // 4} buckets, expected "
+                f"{buckets_per_side}x{buckets_per_side} = {buckets_per_side * buckets_per_side}")
+        arr = np.frombuffer(raw, dtype=np.int32)
+        columns.append(arr.reshape(buckets_per_side, buckets_per_side).tolist())
+    
+    keys = [key for key, _ in _PACKED_BUCKET_FIELDS]
+    return [
+        [dict(zip(keys, values)) for values in zip(*row_columns)]
+        for row_columns in zip(*columns)
+    ]
+
+
 def menu_func_export(self, context):
     self.layout.operator(EXPORT_SCENE_OT_mapgeo.bl_idname, text="League of Legends Mapgeo (.mapgeo)")
 
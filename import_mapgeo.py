@@ -480,8 +480,7 @@ class IMPORT_SCENE_OT_mapgeo(bpy.types.Operator, ImportHelper):
                 # This provides better organization for meshes with baron visibility
                 if "baron_layers_decoded" in obj and obj["baron_layers_decoded"]:
                     try:
-                        import ast
-                        baron_layers = ast.literal_eval(obj["baron_layers_decoded"])
+                        baron_layers = baron_hash_parser.parse_layer_list(obj["baron_layers_decoded"])
                         for baron_state_bit in baron_layers:
                             if baron_state_bit in baron_collections:
                                 baron_collections[baron_state_bit].objects.link(obj)
@@ -549,14 +548,12 @@ class IMPORT_SCENE_OT_mapgeo(bpy.types.Operator, ImportHelper):
                             # Store decoded baron layers (if any)
                             if controller.baron_layers:
                                 # Convert set to sorted list for storage
-                                baron_layers_list = sorted(list(controller.baron_layers))
-                                obj["baron_layers_decoded"] = str(baron_layers_list)
+                                obj["baron_layers_decoded"] = baron_hash_parser.format_layer_list(controller.baron_layers)
                             
                             # Store decoded dragon layers (if any)
                             if controller.dragon_layers:
                                 # Convert set to sorted list for storage
-                                dragon_layers_list = sorted(list(controller.dragon_layers))
-                                obj["baron_dragon_layers_decoded"] = str(dragon_layers_list)
+                                obj["baron_dragon_layers_decoded"] = baron_hash_parser.format_layer_list(controller.dragon_layers)
                             
                             # Store parent mode for reference
                             obj["baron_parent_mode"] = controller.parent_mode
@@ -691,8 +688,9 @@ class IMPORT_SCENE_OT_mapgeo(bpy.types.Operator, ImportHelper):
             # Create or get material with crimson red color and transparency
             mat_name = f"{grid_name}_Material"
             # Check if material exists and remove it to ensure fresh creation
-            if mat_name in bpy.data.materials:
-                bpy.data.materials.remove(bpy.data.materials[mat_name])
+            existing_mat = bpy.data.materials.get(mat_name)
+            if existing_mat is not None:
+                bpy.data.materials.remove(existing_mat)
             
             mat = bpy.data.materials.new(name=mat_name)
             mat.use_nodes = True
@@ -823,8 +821,9 @@ class IMPORT_SCENE_OT_mapgeo(bpy.types.Operator, ImportHelper):
             # Create or get material for bounding box
             bbox_mat_name = f"{bbox_name}_Material"
             # Check if material exists and remove it to ensure fresh creation
-            if bbox_mat_name in bpy.data.materials:
-                bpy.data.materials.remove(bpy.data.materials[bbox_mat_name])
+            existing_mat = bpy.data.materials.get(bbox_mat_name)
+            if existing_mat is not None:
+                bpy.data.materials.remove(existing_mat)
             
             bbox_mat = bpy.data.materials.new(name=bbox_mat_name)
             bbox_mat.use_nodes = True
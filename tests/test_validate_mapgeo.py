@@ -0,0 +1,50 @@
+"""
+Regression tests for the standalone mapgeo validator
+
+The addon package itself needs Blender, so run these with unittest from the
+repository root: python -m unittest discover -s tests
+"""
+
+import os
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from validate_mapgeo import MapgeoValidator
+
+
+def _validate_errors(data: bytes):
+    """Validate an in-memory file, recording errors only"""
+    return MapgeoValidator(data, verbosity='errors').validate()
+
+
+class TestCorruptStringLengths(unittest.TestCase):
+    
+    def test_bad_sampler_name_length_stops_parse(self):
+        # v17 header, one sampler whose name length runs far past the end of file
+        data = b'OEGM' + struct.pack('<IIiI', 17, 1, 0, 0xFFFFFFF0) + b'\0' * 64
+        
+        errors = _validate_errors(data)
+        
+        self.assertEqual([issue.category for issue in errors], ["SAMPLERS"])
+        self.assertIn("stopping parse", errors[0].message)
+        self.assertEqual(errors[0].offset, 16)
+    
+    def test_bad_mesh_name_length_stops_parse(self):
+        # v11: two skipped sampler strings, no VB descs/VBs/IBs, then one
+        # mesh with a corrupt name length
+        data = (b'OEGM' + struct.pack('<I', 11)
+                + struct.pack('<II', 0, 0)
+                + struct.pack('<IIII', 0, 0, 0, 1)
+                + struct.pack('<I', 5000) + b'\0' * 64)
+        
+        errors = _validate_errors(data)
+        
+        self.assertEqual([issue.category for issue in errors], ["MESH"])
+        self.assertIn("name: Invalid string length 5000", errors[0].message)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,24 +3,234 @@ UI Panel for Mapgeo Addon
 Sidebar panels for layer management and import/export settings
 """
 
+import functools
+import re
+from collections import defaultdict
+from pathlib import PureWindowsPath
+
 import bpy
+import numpy as np
+from bpy.app.handlers import persistent
 from bpy.types import Panel, UIList
 
+from . import baron_hash_parser
+
+# Numba is not bundled with Blender; when it has been installed into Blender's
+# Python, bucket grid creation uses a compiled kernel for the bucket scatter
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Layer bit -> display name lookups used by the mesh properties section
+_BARON_LAYER_NAMES = {1: "Base", 2: "Cup", 4: "Tunnel", 8: "Upgraded"}
+_DRAGON_LAYER_NAMES = {
+    1: "Base", 2: "Inferno", 4: "Mountain", 8: "Ocean",
+    16: "Cloud", 32: "Hextech", 64: "Chemtech", 128: "Void"
+}
+_DRAGON_LAYER_TUPLES = tuple(_DRAGON_LAYER_NAMES.items())
+
+# Layer collection name suffix ("<Map>_Inferno") -> dragon layer flag
+_SUFFIX_TO_FLAG = {name: flag for flag, name in _DRAGON_LAYER_NAMES.items()}
+
+# Baron layer bits for every value of the 4-bit baron_layers_mask
+_BARON_MASK_BITS = tuple(
+    tuple(bit for bit in _BARON_LAYER_NAMES if mask & bit) for mask in range(16)
+)
+
+# Prebuilt bullet labels for the decoded baron/dragon layer lists
+_BARON_LAYER_LABELS = {bit: f"  • {name}" for bit, name in _BARON_LAYER_NAMES.items()}
+_DRAGON_LAYER_LABELS = {bit: f"  • {name}" for bit, name in _DRAGON_LAYER_NAMES.items()}
 
-def _material_items(self, context):
-    items = [("", "(No Material)", "Leave material unchanged")]
-    for mat in bpy.data.materials:
-        items.append((mat.name, mat.name, ""))
-    return items
+# Static button layouts for the Layer Management section
+_LAYER_BUTTONS = (
+    (1, "Toggle Layer 1 (Base)"), (2, "Toggle Layer 2 (Inferno)"),
+    (3, "Toggle Layer 3 (Mountain)"), (4, "Toggle Layer 4 (Ocean)"),
+    (5, "Toggle Layer 5 (Cloud)"), (6, "Toggle Layer 6 (Hextech)"),
+    (7, "Toggle Layer 7 (Chemtech)"), (8, "Toggle Layer 8 (Void)"),
+)
+_QUALITY_PRESETS = (0, 63, 127, 191, 255)
+
+# Exactly 8 hex digits (baron / render region hashes)
+_HEX8_RE = re.compile(r"^[0-9A-Fa-f]{8}$")
+
+
+def _normalize_hex8(value):
+    """Return an 8-digit hex hash in canonical uppercase, or None if invalid"""
+    if not _HEX8_RE.match(value):
+        return None
+    # Skip the copy when the value is already canonical
+    return value if value.isupper() or value.isdigit() else value.upper()
+
+
+# Map11 testing paths used by MAPGEO_OT_set_test_paths
+# Note: If using Map11LEVELS.wad (separate file), adjust paths accordingly
+# Levels folder should point to where grass tint textures live (will search recursively)
+_TEST_MAP11_ROOT = PureWindowsPath(r"C:\Riot Games\League of Legends\Game\DATA\FINAL\Maps\Shipping\Map11.wad")
+_TEST_PATHS = (
+    ("assets_folder", str(_TEST_MAP11_ROOT / "assets")),
+    ("levels_folder", str(_TEST_MAP11_ROOT / "levels")),
+    ("materials_json_path", str(_TEST_MAP11_ROOT / "data" / "maps" / "mapgeometry" / "map11" / "base_srx.materials.bin.json")),
+    ("map_py_path", ""),
+)
+
+# Custom properties that mark a mesh as carrying mapgeo metadata
+_MAPGEO_KEYS = ("baron_hash", "visibility_layer", "quality", "is_bush", "render_flags", "render_region_hash")
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_layer_list(raw):
+    """Parse a stored layer list string such as "1,4" (cached by content)"""
+    return tuple(baron_hash_parser.parse_layer_list(raw))
+
+
+@functools.lru_cache(maxsize=1)
+def _last_import_label(path):
+    """Format the Scene Info "Last Import" label (cached for the current path)"""
+    return f"Last Import: ...{path[-30:]}"
+
+
+def _iter_selected_meshes(context):
+    """Yield selected mesh objects without materializing context.selected_objects"""
+    return (o for o in context.view_layer.objects.selected if o.type == 'MESH')
+
+
+def _has_mapgeo_props(obj):
+    """Return True if obj has any mapgeo custom property worth displaying"""
+    keys = obj.keys()
+    return any(k in keys for k in _MAPGEO_KEYS)
+
+
+def _get_decoded(raw):
+    """Return the decoded layer list for a stored string, or None if unparsable"""
+    try:
+        return _parse_layer_list(raw)
+    except Exception:
+        return None
+
+
+def _get_baron_layers(obj):
+    """Return the baron layer bits stored on obj, or None if there are none
+
+    Prefers the integer baron_layers_mask written by the Setup Wizard and
+    falls back to the baron_layers_decoded list string written on import.
+    """
+    mask = obj.get("baron_layers_mask")
+    if mask is not None:
+        return _BARON_MASK_BITS[mask & 0xF]
+    raw = obj.get("baron_layers_decoded")
+    if raw is None:
+        return None
+    return _get_decoded(raw) or ()
+
+
+def _refresh_environment_visibility(context):
+    """Re-apply the dragon/baron environment filters to the scene"""
+    # Imported here: ui_panel is loaded while the package __init__ is still
+    # executing, before update_environment_visibility is defined
+    from . import update_environment_visibility
+    settings = context.scene.mapgeo_settings
+    if not hasattr(settings, 'dragon_layer_filter'):
+        return
+    update_environment_visibility(settings, context)
 
 
+# Cached EnumProperty items for MAPGEO_OT_setup_mesh.material_name. Blender requires
+# the returned strings to stay referenced from Python, so the list lives at module scope.
+_material_items_cache = []
+_material_items_token = None
+_material_items_generation = 0
+
+
+@persistent
+def invalidate_material_items(scene=None, depsgraph=None):
+    """Invalidate the material enum cache (depsgraph_update_post / load_post handler)"""
+    global _material_items_generation
+    if depsgraph is None or depsgraph.id_type_updated('MATERIAL'):
+        _material_items_generation += 1
+
+
+def _material_items(self, context):
+    global _material_items_cache, _material_items_token
+    materials = bpy.data.materials
+    token = (len(materials), _material_items_generation)
+    if token != _material_items_token:
+        items = [("", "(No Material)", "Leave material unchanged")]
+        for mat in materials:
+            items.append((mat.name, mat.name, ""))
+        _material_items_cache = items
+        _material_items_token = token
+    return _material_items_cache
+
+
+
+# Mesh / selected-mesh / bucket grid counts shown in the main panel.
+# Recounted lazily in draw() only after a depsgraph update (which includes
+# selection changes and collection removal) or a file load marks them dirty.
+_scene_counts = {"scene": None, "total": 0, "selected": 0, "bucket_grids": 0, "dirty": True}
+
+
+@persistent
+def invalidate_scene_counts(*_args):
+    """Mark the cached mesh counts stale (depsgraph_update_post / load_post handler)"""
+    _scene_counts["dirty"] = True
+
+
+def _get_scene_counts(context):
+    scene_ptr = context.scene.as_pointer()
+    if _scene_counts["dirty"] or _scene_counts["scene"] != scene_ptr:
+        _scene_counts["total"] = sum(1 for obj in context.scene.objects if obj.type == 'MESH')
+        _scene_counts["selected"] = sum(1 for _ in _iter_selected_meshes(context))
+        _scene_counts["bucket_grids"] = sum(
+            col.get("bucket_grid_count", 0) for col in bpy.data.collections
+            if col.get("is_bucket_grid_collection")
+        )
+        _scene_counts["scene"] = scene_ptr
+        _scene_counts["dirty"] = False
+    return _scene_counts["total"], _scene_counts["selected"], _scene_counts["bucket_grids"]
+
+
+def _build_layer_collection_index():
+    """Return ((flag, [(collection, member_names), ...]), ...) for the dragon layers
+
+    Layer collections are matched by their "_<LayerName>" suffix in a single
+    pass over bpy.data.collections. Each one is paired with a set of its
+    object names so membership tests don't walk the collection's object list.
+    """
+    by_flag = {flag: [] for flag in _DRAGON_LAYER_NAMES}
+    for coll in bpy.data.collections:
+        _, sep, suffix = coll.name.rpartition("_")
+        flag = _SUFFIX_TO_FLAG.get(suffix) if sep else None
+        if flag:
+            by_flag[flag].append((coll, set(coll.objects.keys())))
+    return tuple(by_flag.items())
+
+
+def _update_layer_collections(obj, visibility_mask, layer_colls, to_link, to_unlink):
+    """Queue link/unlink of obj so its layer collections match visibility_mask"""
+    obj_name = obj.name
+    for flag, colls in layer_colls:
+        wanted = bool(visibility_mask & flag)
+        for coll, members in colls:
+            if wanted:
+                if obj_name not in members:
+                    to_link[coll].append(obj)
+                    members.add(obj_name)
+            elif obj_name in members:
+                to_unlink[coll].append(obj)
+                members.discard(obj_name)
 
 class MAPGEO_OT_setup_mesh(bpy.types.Operator):
     """Setup wizard to assign mapgeo properties for selected meshes"""
     bl_idname = "mapgeo.setup_mesh"
     bl_label = "Mapgeo Setup Wizard"
     bl_description = "Assign mapgeo fields for selected meshes in one dialog"
-    bl_options = {'REGISTER', 'UNDO'}
+    # No automatic 'UNDO': bl_options is fixed per class, so the step is
+    # pushed explicitly in execute() where Fast Mode can skip it. The default
+    # path costs the same as 'UNDO'; it only loses the Adjust Last Operation
+    # panel, which adds nothing here since every option is set in the dialog
+    bl_options = {'REGISTER'}
 
     set_visibility_layer: bpy.props.BoolProperty(
         name="Set Dragon Layer",
@@ -147,6 +357,13 @@ class MAPGEO_OT_setup_mesh(bpy.types.Operator):
         description="Assign material to selected meshes",
         items=_material_items
     )
+    skip_undo: bpy.props.BoolProperty(
+        name="Fast Mode (No Undo)",
+        description="Don't record a separate undo step for this edit. Faster on very large scenes; "
+                    "the change is folded into the next undo step and is reverted together with it",
+        default=False,
+        options={'SKIP_SAVE'}
+    )
 
     def draw(self, context):
         layout = self.layout
@@ -185,6 +402,8 @@ class MAPGEO_OT_setup_mesh(bpy.types.Operator):
         row.prop(self, "set_baron_hash")
         if self.set_baron_hash:
             box.prop(self, "baron_hash")
+            if not _HEX8_RE.match(self.baron_hash):
+                box.label(text="Must be exactly 8 hex characters", icon='ERROR')
 
         box = layout.box()
         row = box.row()
@@ -202,6 +421,8 @@ class MAPGEO_OT_setup_mesh(bpy.types.Operator):
         row.prop(self, "set_render_region_hash")
         if self.set_render_region_hash:
             box.prop(self, "render_region_hash")
+            if not _HEX8_RE.match(self.render_region_hash):
+                box.label(text="Must be exactly 8 hex characters", icon='ERROR')
 
         box = layout.box()
         row = box.row()
@@ -227,90 +448,101 @@ class MAPGEO_OT_setup_mesh(bpy.types.Operator):
         if self.set_material:
             box.prop(self, "material_name")
 
+        layout.prop(self, "skip_undo")
+
+    def check(self, context):
+        # Normalize valid hashes to uppercase while the dialog is open so
+        # execute() can store them as-is; returning True redraws the
+        # dialog and refreshes the validation labels
+        for prop in ("baron_hash", "render_region_hash"):
+            value = getattr(self, prop)
+            normalized = _normalize_hex8(value)
+            if normalized is not None and normalized != value:
+                setattr(self, prop, normalized)
+        return True
+
     def execute(self, context):
-        def update_layer_collections(obj, visibility_mask):
-            layer_map = {
-                1: "Base", 2: "Inferno", 4: "Mountain", 8: "Ocean",
-                16: "Cloud", 32: "Hextech", 64: "Chemtech", 128: "Void"
-            }
-            for flag, name in layer_map.items():
-                for coll in bpy.data.collections:
-                    if coll.name.endswith(f"_{name}"):
-                        if visibility_mask & flag:
-                            if obj.name not in coll.objects:
-                                coll.objects.link(obj)
-                        else:
-                            if obj.name in coll.objects:
-                                coll.objects.unlink(obj)
+        if not any((
+            self.set_visibility_layer, self.set_quality, self.set_bush,
+            self.set_baron_hash, self.set_baron_layers, self.set_render_region_hash,
+            self.set_render_flags, self.set_layer_transition,
+            self.set_backface_culling, self.set_material,
+        )):
+            self.report({'INFO'}, "No fields selected")
+            return {'CANCELLED'}
 
-        count = 0
+        mesh_objs = list(_iter_selected_meshes(context))
         warn_no_baron_hash = False
 
-        for obj in context.selected_objects:
-            if obj.type != 'MESH':
-                continue
+        # Validate hex fields once, before any object is modified
+        baron_hash_upper = _normalize_hex8(self.baron_hash)
+        region_hash_upper = _normalize_hex8(self.render_region_hash)
+        if self.set_baron_hash and baron_hash_upper is None:
+            self.report({'ERROR'}, "Baron hash must be exactly 8 hex characters (0-9, A-F)")
+            return {'CANCELLED'}
+        if self.set_render_region_hash and region_hash_upper is None:
+            self.report({'ERROR'}, "Render region hash must be exactly 8 hex characters (0-9, A-F)")
+            return {'CANCELLED'}
 
+        # Membership changes are queued per collection and applied after the
+        # selection loop, so each collection is edited in one batch
+        layer_colls = _build_layer_collection_index() if self.set_visibility_layer else ()
+        to_link = defaultdict(list)
+        to_unlink = defaultdict(list)
+
+        # Dialog values are constant for the whole selection; compute them once
+        base_mask = (
+            self.layer_base
+            | (self.layer_inferno << 1)
+            | (self.layer_mountain << 2)
+            | (self.layer_ocean << 3)
+            | (self.layer_cloud << 4)
+            | (self.layer_hextech << 5)
+            | (self.layer_chemtech << 6)
+            | (self.layer_void << 7)
+        )
+        add_mode = self.visibility_mode == 'ADD'
+        qual = int(self.quality)
+        bush = bool(self.is_bush)
+        baron_layers_mask = (
+            self.baron_base
+            | (self.baron_cup << 1)
+            | (self.baron_tunnel << 2)
+            | (self.baron_upgraded << 3)
+        )
+        baron_parent_mode = int(self.baron_parent_mode)
+        mat = bpy.data.materials.get(self.material_name) if self.set_material and self.material_name else None
+
+        for obj in mesh_objs:
             if self.set_visibility_layer:
-                new_mask = 0
-                if self.layer_base:
-                    new_mask |= 1
-                if self.layer_inferno:
-                    new_mask |= 2
-                if self.layer_mountain:
-                    new_mask |= 4
-                if self.layer_ocean:
-                    new_mask |= 8
-                if self.layer_cloud:
-                    new_mask |= 16
-                if self.layer_hextech:
-                    new_mask |= 32
-                if self.layer_chemtech:
-                    new_mask |= 64
-                if self.layer_void:
-                    new_mask |= 128
-                if self.visibility_mode == 'ADD':
-                    new_mask = obj.get("visibility_layer", 0) | new_mask
-                obj["visibility_layer"] = new_mask
-                update_layer_collections(obj, new_mask)
+                old_mask = obj.get("visibility_layer")
+                new_mask = (old_mask or 0) | base_mask if add_mode else base_mask
+                if new_mask != old_mask:
+                    obj["visibility_layer"] = new_mask
+                _update_layer_collections(obj, new_mask, layer_colls, to_link, to_unlink)
 
             if self.set_quality:
-                obj["quality"] = int(self.quality)
+                obj["quality"] = qual
 
             if self.set_bush:
-                obj["is_bush"] = bool(self.is_bush)
+                obj["is_bush"] = bush
 
             if self.set_baron_hash:
-                try:
-                    int(self.baron_hash, 16)
-                except ValueError:
-                    self.report({'ERROR'}, "Invalid Baron Hash: use 8 hex characters")
-                    return {'CANCELLED'}
-                obj["baron_hash"] = self.baron_hash.upper()
+                obj["baron_hash"] = baron_hash_upper
 
             if self.set_baron_layers:
-                baron_layers = []
-                if self.baron_base:
-                    baron_layers.append(1)
-                if self.baron_cup:
-                    baron_layers.append(2)
-                if self.baron_tunnel:
-                    baron_layers.append(4)
-                if self.baron_upgraded:
-                    baron_layers.append(8)
-                obj["baron_layers_decoded"] = str(baron_layers)
-                obj["baron_parent_mode"] = int(self.baron_parent_mode)
+                obj["baron_layers_mask"] = baron_layers_mask
+                # The mask supersedes any list string left over from import
+                if "baron_layers_decoded" in obj:
+                    del obj["baron_layers_decoded"]
+                obj["baron_parent_mode"] = baron_parent_mode
 
                 current_hash = obj.get("baron_hash", "00000000")
                 if current_hash == "00000000":
                     warn_no_baron_hash = True
 
             if self.set_render_region_hash:
-                try:
-                    int(self.render_region_hash, 16)
-                except ValueError:
-                    self.report({'ERROR'}, "Invalid Render Region Hash: use 8 hex characters")
-                    return {'CANCELLED'}
-                obj["render_region_hash"] = self.render_region_hash.upper()
+                obj["render_region_hash"] = region_hash_upper
 
             if self.set_render_flags:
                 obj["render_flags"] = int(self.render_flags)
@@ -321,25 +553,32 @@ class MAPGEO_OT_setup_mesh(bpy.types.Operator):
             if self.set_backface_culling:
                 obj["disable_backface_culling"] = int(self.disable_backface_culling)
 
-            if self.set_material and self.material_name:
-                mat = bpy.data.materials.get(self.material_name)
-                if mat:
-                    if obj.data.materials:
-                        obj.data.materials[0] = mat
-                    else:
-                        obj.data.materials.append(mat)
-
-            count += 1
-
-        # Trigger visibility update to show/hide based on current filter
-        settings = context.scene.mapgeo_settings
-        if hasattr(settings, 'dragon_layer_filter'):
-            from . import update_environment_visibility
-            update_environment_visibility(settings, context)
+            if mat:
+                if obj.data.materials:
+                    obj.data.materials[0] = mat
+                else:
+                    obj.data.materials.append(mat)
+
+        # Apply the queued collection membership changes
+        for coll, objs in to_link.items():
+            coll_objects = coll.objects
+            for obj in objs:
+                coll_objects.link(obj)
+        for coll, objs in to_unlink.items():
+            coll_objects = coll.objects
+            for obj in objs:
+                coll_objects.unlink(obj)
+
+        # Re-apply the filters only if a visibility-affecting field changed
+        if self.set_visibility_layer or self.set_baron_hash or self.set_baron_layers:
+            _refresh_environment_visibility(context)
 
         if warn_no_baron_hash:
             self.report({'WARNING'}, "Baron layers set but baron_hash is 00000000; visibility filter will ignore baron layers")
-        self.report({'INFO'}, f"Applied mapgeo settings to {count} mesh objects")
+        if not self.skip_undo:
+            bpy.ops.ed.undo_push(message=self.bl_label)
+
+        self.report({'INFO'}, f"Applied mapgeo settings to {len(mesh_objs)} mesh objects")
         return {'FINISHED'}
 
     def invoke(self, context, event):
@@ -377,30 +616,40 @@ class VIEW3D_PT_mapgeo_panel(Panel):
         box = layout.box()
         box.label(text="Scene Info", icon='INFO')
         
-        # Count mesh objects
-        mesh_count = len([obj for obj in context.scene.objects if obj.type == 'MESH'])
-        box.label(text=f"Mesh Objects: {mesh_count}")
-        
-        # Count selected meshes
-        selected_count = len([obj for obj in context.selected_objects if obj.type == 'MESH'])
-        box.label(text=f"Selected Meshes: {selected_count}")
+        # Mesh / selected-mesh counts (cached until the scene changes)
+        mesh_count, selected_count, _ = _get_scene_counts(context)
+        box.label(text="Mesh Objects: %d" % mesh_count)
+        box.label(text="Selected Meshes: %d" % selected_count)
         
         # Last paths
         if settings.last_import_path:
-            box.label(text=f"Last Import: ...{settings.last_import_path[-30:]}", icon='FILE_FOLDER')
-
-
-class VIEW3D_PT_mapgeo_layers_panel(Panel):
-    """Layer Management Panel"""
-    bl_space_type = 'VIEW_3D'
-    bl_region_type = 'UI'
-    bl_category = 'LoL Mapgeo'
-    bl_label = "Layer Management"
-    bl_parent_id = "VIEW3D_PT_mapgeo_panel"
-    bl_options = {'DEFAULT_CLOSED'}
+            box.label(text=_last_import_label(settings.last_import_path), icon='FILE_FOLDER')
+        
+        # Collapsible sections (collapsed sections skip drawing entirely)
+        header, body = layout.panel("mapgeo_layers", default_closed=True)
+        header.label(text="Layer Management")
+        if body is not None:
+            self._draw_layers(body, context)
+        
+        header, body = layout.panel("mapgeo_import", default_closed=True)
+        header.label(text="Import Settings")
+        if body is not None:
+            self._draw_import(body, context)
+        
+        header, body = layout.panel("mapgeo_export", default_closed=True)
+        header.label(text="Export Settings")
+        if body is not None:
+            self._draw_export(body, context)
+        
+        obj = context.active_object
+        if obj and obj.type == 'MESH' and _has_mapgeo_props(obj):
+            header, body = layout.panel("mapgeo_properties", default_closed=True)
+            header.label(text="Mesh Properties")
+            if body is not None:
+                self._draw_properties(body, context)
     
-    def draw(self, context):
-        layout = self.layout
+    def _draw_layers(self, layout, context):
+        """Layer Management section"""
         settings = context.scene.mapgeo_settings
         
         # Environment visibility filters (League engine style)
@@ -446,16 +695,12 @@ class VIEW3D_PT_mapgeo_layers_panel(Panel):
         box.label(text="Layer Operations (Toggle)", icon='OUTLINER_DATA_MESH')
         
         col = box.column(align=True)
-        col.operator("mapgeo.assign_layer", text="Toggle Layer 1 (Base)").layer = 1
-        col.operator("mapgeo.assign_layer", text="Toggle Layer 2 (Inferno)").layer = 2
-        col.operator("mapgeo.assign_layer", text="Toggle Layer 3 (Mountain)").layer = 3
-        col.operator("mapgeo.assign_layer", text="Toggle Layer 4 (Ocean)").layer = 4
+        for layer_id, label in _LAYER_BUTTONS[:4]:
+            col.operator("mapgeo.assign_layer", text=label).layer = layer_id
         
         col = box.column(align=True)
-        col.operator("mapgeo.assign_layer", text="Toggle Layer 5 (Cloud)").layer = 5
-        col.operator("mapgeo.assign_layer", text="Toggle Layer 6 (Hextech)").layer = 6
-        col.operator("mapgeo.assign_layer", text="Toggle Layer 7 (Chemtech)").layer = 7
-        col.operator("mapgeo.assign_layer", text="Toggle Layer 8 (Void)").layer = 8
+        for layer_id, label in _LAYER_BUTTONS[4:]:
+            col.operator("mapgeo.assign_layer", text=label).layer = layer_id
         
         layout.separator()
         
@@ -466,12 +711,11 @@ class VIEW3D_PT_mapgeo_layers_panel(Panel):
         col = box.column(align=True)
         col.label(text="Common Presets:", icon='PRESET')
         row = col.row(align=True)
-        row.operator("mapgeo.set_quality", text="0").quality = 0
-        row.operator("mapgeo.set_quality", text="63").quality = 63
-        row.operator("mapgeo.set_quality", text="127").quality = 127
+        for quality in _QUALITY_PRESETS[:3]:
+            row.operator("mapgeo.set_quality", text=str(quality)).quality = quality
         row = col.row(align=True)
-        row.operator("mapgeo.set_quality", text="191").quality = 191
-        row.operator("mapgeo.set_quality", text="255").quality = 255
+        for quality in _QUALITY_PRESETS[3:]:
+            row.operator("mapgeo.set_quality", text=str(quality)).quality = quality
         
         col.separator()
         col.operator("mapgeo.set_quality", text="Custom Quality...", icon='PROPERTIES')
@@ -521,26 +765,12 @@ class VIEW3D_PT_mapgeo_layers_panel(Panel):
         col.operator("mapgeo.create_bucket_grid", text="Create Custom Bucket Grid", icon='ADD')
         
         # Show bucket grid info
-        bg_count = 0
-        for col_item in bpy.data.collections:
-            if col_item.get("is_bucket_grid_collection"):
-                bg_count = col_item.get("bucket_grid_count", 0)
-                break
+        bg_count = _get_scene_counts(context)[2]
         if bg_count > 0:
             box.label(text=f"Grids in scene: {bg_count}", icon='INFO')
-
-
-class VIEW3D_PT_mapgeo_import_panel(Panel):
-    """Import Settings Panel"""
-    bl_space_type = 'VIEW_3D'
-    bl_region_type = 'UI'
-    bl_category = 'LoL Mapgeo'
-    bl_label = "Import Settings"
-    bl_parent_id = "VIEW3D_PT_mapgeo_panel"
-    bl_options = {'DEFAULT_CLOSED'}
     
-    def draw(self, context):
-        layout = self.layout
+    def _draw_import(self, layout, context):
+        """Import Settings section"""
         settings = context.scene.mapgeo_settings
         
         box = layout.box()
@@ -585,19 +815,9 @@ class VIEW3D_PT_mapgeo_import_panel(Panel):
         box.label(text="Supported:", icon='FILE')
         box.label(text="  .materials.bin.json / .materials.py")
         box.label(text="  map*.py / map*.json (grass tint)")
-
-
-class VIEW3D_PT_mapgeo_export_panel(Panel):
-    """Export Settings Panel"""
-    bl_space_type = 'VIEW_3D'
-    bl_region_type = 'UI'
-    bl_category = 'LoL Mapgeo'
-    bl_label = "Export Settings"
-    bl_parent_id = "VIEW3D_PT_mapgeo_panel"
-    bl_options = {'DEFAULT_CLOSED'}
     
-    def draw(self, context):
-        layout = self.layout
+    def _draw_export(self, layout, context):
+        """Export Settings section"""
         settings = context.scene.mapgeo_settings
         
         box = layout.box()
@@ -620,30 +840,20 @@ class VIEW3D_PT_mapgeo_export_panel(Panel):
             box.label(text="• Current format", icon='CHECKMARK')
         else:
             box.label(text="• Legacy format", icon='ERROR')
-
-
-class VIEW3D_PT_mapgeo_properties_panel(Panel):
-    """Mesh Properties Viewer/Editor Panel"""
-    bl_space_type = 'VIEW_3D'
-    bl_region_type = 'UI'
-    bl_category = 'LoL Mapgeo'
-    bl_label = "Mesh Properties"
-    bl_parent_id = "VIEW3D_PT_mapgeo_panel"
-    bl_options = {'DEFAULT_CLOSED'}
     
-    @classmethod
-    def poll(cls, context):
-        return context.active_object and context.active_object.type == 'MESH'
-    
-    def draw(self, context):
-        layout = self.layout
+    def _draw_properties(self, layout, context):
+        """Mesh Properties viewer section"""
         obj = context.active_object
         
         if not obj or obj.type != 'MESH':
             return
         
+        # Read each mapgeo property once; None means the property is absent
+        props = {k: obj.get(k) for k in _MAPGEO_KEYS}
+        
         # Baron Hash System (takes priority over layer system)
-        has_baron_hash = "baron_hash" in obj and obj["baron_hash"] != "00000000"
+        baron_hash = props["baron_hash"]
+        has_baron_hash = baron_hash is not None and baron_hash != "00000000"
         
         if has_baron_hash:
             box = layout.box()
@@ -651,66 +861,69 @@ class VIEW3D_PT_mapgeo_properties_panel(Panel):
             
             row = box.row()
             row.label(text="Hash:", icon='INFO')
-            row.label(text=obj["baron_hash"])
+            row.label(text=baron_hash)
             
             # Warning that this overrides layer system
             row = box.row()
             row.label(text="⚠ Overrides Dragon Layer System", icon='ERROR')
             
+            parent_mode = obj.get("baron_parent_mode")
+            baron_layers = _get_baron_layers(obj)
+            dragon_layers_raw = obj.get("baron_dragon_layers_decoded")
+            
             # Show parent mode if available
-            if "baron_parent_mode" in obj:
-                parent_mode = obj["baron_parent_mode"]
+            if parent_mode is not None:
                 mode_text = "Not Visible" if parent_mode == 3 else "Visible" if parent_mode == 1 else f"Mode {parent_mode}"
                 row = box.row()
                 row.label(text=f"Parent Mode: {mode_text}")
             
-            # Show decoded Baron Layers (Baron pit states)
-            if "baron_layers_decoded" in obj:
-                info_box = box.box()
-                info_box.label(text="Baron Pit Layers:", icon='MESH_CUBE')
-                
-                # Parse the stored list
-                import ast
-                try:
-                    baron_layers = ast.literal_eval(obj["baron_layers_decoded"])
-                    layer_names = {1: "Base", 2: "Cup", 4: "Tunnel", 8: "Upgraded"}
+            # Decoded layer lists are only laid out when details are expanded
+            settings = context.scene.mapgeo_settings
+            show_details = settings.show_properties_details
+            row = box.row()
+            row.prop(settings, "show_properties_details",
+                     icon='DISCLOSURE_TRI_DOWN' if show_details else 'DISCLOSURE_TRI_RIGHT',
+                     emboss=False)
+            
+            if show_details:
+                # Show decoded Baron Layers (Baron pit states)
+                if baron_layers is not None:
+                    info_box = box.box()
+                    info_box.label(text="Baron Pit Layers:", icon='MESH_CUBE')
+                    
                     for layer_bit in baron_layers:
                         row = info_box.row()
-                        row.label(text=f"  • {layer_names.get(layer_bit, f'Custom ({layer_bit})')}", icon='CHECKMARK')
-                except:
-                    pass
+                        label = _BARON_LAYER_LABELS.get(layer_bit) or f"  • Custom ({layer_bit})"
+                        row.label(text=label, icon='CHECKMARK')
             
-            # Show decoded Dragon Layers (which dragon layers affect this)
-            if "baron_dragon_layers_decoded" in obj:
-                info_box = box.box()
-                info_box.label(text="Referenced Dragon Layers:", icon='OUTLINER_DATA_MESH')
+                # Show decoded Dragon Layers (which dragon layers affect this)
+                if dragon_layers_raw is not None:
+                    info_box = box.box()
+                    info_box.label(text="Referenced Dragon Layers:", icon='OUTLINER_DATA_MESH')
                 
-                # Parse the stored list
-                import ast
-                try:
-                    dragon_layers = ast.literal_eval(obj["baron_dragon_layers_decoded"])
-                    layer_names = {1: "Base", 2: "Inferno", 4: "Mountain", 8: "Ocean", 
-                                   16: "Cloud", 32: "Hextech", 64: "Chemtech", 128: "Void"}
-                    for layer_bit in dragon_layers:
-                        row = info_box.row()
-                        row.label(text=f"  • {layer_names.get(layer_bit, f'Bit {layer_bit}')}", icon='CHECKMARK')
-                except:
-                    pass
+                    # Parse the stored list
+                    dragon_layers = _get_decoded(dragon_layers_raw)
+                    if dragon_layers is not None:
+                        for layer_bit in dragon_layers:
+                            row = info_box.row()
+                            label = _DRAGON_LAYER_LABELS.get(layer_bit) or f"  • Bit {layer_bit}"
+                            row.label(text=label, icon='CHECKMARK')
             
-            # Info about baron system
-            if "baron_layers_decoded" not in obj and "baron_dragon_layers_decoded" not in obj:
-                info_box = box.box()
-                info_box.label(text="Baron Hash System (4 states):", icon='WORDWRAP_ON')
-                info_box.label(text="• Base (default)")
-                info_box.label(text="• Cup (bit 1)")
-                info_box.label(text="• Tunnel (bit 2)")
-                info_box.label(text="• Upgraded (bit 3)")
-                info_box.label(text="Load materials.bin.json to decode")
+                # Info about baron system
+                if baron_layers is None and dragon_layers_raw is None:
+                    info_box = box.box()
+                    info_box.label(text="Baron Hash System (4 states):", icon='WORDWRAP_ON')
+                    info_box.label(text="• Base (default)")
+                    info_box.label(text="• Cup (bit 1)")
+                    info_box.label(text="• Tunnel (bit 2)")
+                    info_box.label(text="• Upgraded (bit 3)")
+                    info_box.label(text="Load materials.bin.json to decode")
             
             layout.separator()
         
         # Visibility Layers (Dragon/Elemental System)
-        if "visibility_layer" in obj:
+        visibility = props["visibility_layer"]
+        if visibility is not None:
             box = layout.box()
             
             if has_baron_hash:
@@ -718,31 +931,24 @@ class VIEW3D_PT_mapgeo_properties_panel(Panel):
             else:
                 box.label(text="Dragon Layer System", icon='RESTRICT_VIEW_OFF')
             
-            visibility = obj["visibility_layer"]
-            
             grid = box.grid_flow(columns=4, align=True)
-            layer_names = [
-                (1, "Base"), (2, "Inferno"), (4, "Mountain"), (8, "Ocean"),
-                (16, "Cloud"), (32, "Hextech"), (64, "Chemtech"), (128, "Void")
-            ]
             
-            for flag, name in layer_names:
+            for flag, name in _DRAGON_LAYER_TUPLES:
                 is_visible = bool(visibility & flag)
                 icon = 'CHECKMARK' if is_visible else 'BLANK1'
                 grid.label(text=f"{name}", icon=icon)
         
         # Quality
-        if "quality" in obj:
+        quality = props["quality"]
+        if quality is not None:
             box = layout.box()
             box.label(text="Quality", icon='MODIFIER')
             
-            quality = obj["quality"]
-            
             row = box.row()
             row.label(text=f"Value: {quality} / 255")
         
         # Bush Flag
-        if "is_bush" in obj:
+        if props["is_bush"] is not None:
             box = layout.box()
             box.label(text="Bush Assignment", icon='OUTLINER_OB_FORCE_FIELD')
             
@@ -754,21 +960,21 @@ class VIEW3D_PT_mapgeo_properties_panel(Panel):
             op = row.operator("mapgeo.toggle_bush", text="Toggle Bush Flag")
         
         # Render Flags (read-only display)
-        if "render_flags" in obj:
+        render_flags = props["render_flags"]
+        if render_flags is not None:
             layout.separator()
             box = layout.box()
             box.label(text="Render Flags", icon='SHADING_RENDERED')
-            render_flags = obj["render_flags"]
             row = box.row()
             row.label(text=f"Value: 0x{render_flags:04X}")
         
         # Render Region Hash
-        if "render_region_hash" in obj:
+        region_hash = props["render_region_hash"]
+        if region_hash is not None:
             layout.separator()
             box = layout.box()
             box.label(text="Render Region Hash", icon='MESH_GRID')
             row = box.row()
-            region_hash = obj["render_region_hash"]
             row.label(text=f"{region_hash}")
 
 
@@ -813,25 +1019,22 @@ class MAPGEO_OT_initialize_custom_mesh(bpy.types.Operator):
     )
     
     def execute(self, context):
-        count = 0
-        
-        for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                # Initialize essential mapgeo properties
-                obj["visibility_layer"] = int(self.visibility_layer)
-                obj["quality"] = int(self.quality)
-                obj["layer_transition_behavior"] = 0
-                obj["render_flags"] = 0
-                obj["disable_backface_culling"] = 0
-                count += 1
+        mesh_objs = list(_iter_selected_meshes(context))
+        visibility_layer = int(self.visibility_layer)
+        quality = int(self.quality)
+        
+        for obj in mesh_objs:
+            # Initialize essential mapgeo properties
+            obj["visibility_layer"] = visibility_layer
+            obj["quality"] = quality
+            obj["layer_transition_behavior"] = 0
+            obj["render_flags"] = 0
+            obj["disable_backface_culling"] = 0
         
         # Trigger visibility update to show/hide based on current filter
-        settings = context.scene.mapgeo_settings
-        if hasattr(settings, 'dragon_layer_filter'):
-            from . import update_environment_visibility
-            update_environment_visibility(settings, context)
+        _refresh_environment_visibility(context)
         
-        self.report({'INFO'}, f"Initialized {count} custom meshes for mapgeo layer system")
+        self.report({'INFO'}, f"Initialized {len(mesh_objs)} custom meshes for mapgeo layer system")
         return {'FINISHED'}
     
     def invoke(self, context, event):
@@ -849,51 +1052,68 @@ class MAPGEO_OT_assign_layer(bpy.types.Operator):
     
     def execute(self, context):
         count = 0
-        enabled_count = 0
         
         # Calculate layer flag (layers 1-8 map to bits 0-7)
         layer_flag = 1 << (self.layer - 1)
         
-        # Layer names for collection lookup
-        layer_names = {
-            1: "Base", 2: "Inferno", 3: "Mountain", 4: "Ocean",
-            5: "Cloud", 6: "Hextech", 7: "Chemtech", 8: "Void"
-        }
-        target_layer_name = layer_names[self.layer]
+        # Layer name for collection lookup
+        target_layer_name = _DRAGON_LAYER_NAMES[layer_flag]
+        
+        # Find layer collections once instead of per object
+        layer_suffix = f"_{target_layer_name}"
+        # Each paired with a set of member names for O(1) membership tests
+        target_colls = [
+            (coll, set(coll.objects.keys()))
+            for coll in bpy.data.collections
+            if coll.name.endswith(layer_suffix)
+        ]
+        
+        # Collection membership changes are queued, then applied per collection
+        to_link = defaultdict(list)
+        to_unlink = defaultdict(list)
+        
+        for obj in _iter_selected_meshes(context):
+            # Get current visibility layers
+            current_visibility = obj.get("visibility_layer", 0)
+            
+            # Toggle the layer bit
+            new_visibility = current_visibility ^ layer_flag
+            obj["visibility_layer"] = new_visibility
+            
+            count += 1
+            
+            # XOR always flips the toggled bit, so membership can only be
+            # skipped when the map has no collections for this layer
+            if not target_colls:
+                continue
+            
+            # Queue collection links, only for collections whose membership flips
+            should_be_in = bool(new_visibility & layer_flag)
+            obj_name = obj.name
+            for coll, members in target_colls:
+                if (obj_name in members) == should_be_in:
+                    continue
+                if should_be_in:
+                    to_link[coll].append(obj)
+                    members.add(obj_name)
+                else:
+                    to_unlink[coll].append(obj)
+                    members.discard(obj_name)
         
-        for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                # Get current visibility layers
-                current_visibility = obj.get("visibility_layer", 0)
-                
-                # Toggle the layer bit
-                new_visibility = current_visibility ^ layer_flag
-                obj["visibility_layer"] = new_visibility
-                
-                # Update collection links
-                # Find layer collections by checking all collections
-                for coll in bpy.data.collections:
-                    # Check if this is a layer collection
-                    if coll.name.endswith(f"_{target_layer_name}"):
-                        # Check if object should be in this collection
-                        if new_visibility & layer_flag:
-                            # Add to collection if not already there
-                            if obj.name not in coll.objects:
-                                coll.objects.link(obj)
-                                enabled_count += 1
-                        else:
-                            # Remove from collection if present
-                            if obj.name in coll.objects:
-                                coll.objects.unlink(obj)
-                
-                count += 1
+        # Apply queued changes grouped by collection
+        enabled_count = 0
+        for coll, objs in to_link.items():
+            coll_objects = coll.objects
+            for obj in objs:
+                coll_objects.link(obj)
+            enabled_count += len(objs)
+        for coll, objs in to_unlink.items():
+            coll_objects = coll.objects
+            for obj in objs:
+                coll_objects.unlink(obj)
         
         # Trigger visibility update to apply layer filters immediately
-        settings = context.scene.mapgeo_settings
-        if hasattr(settings, 'dragon_layer_filter'):
-            # This will update viewport visibility based on current filters
-            from . import update_environment_visibility
-            update_environment_visibility(settings, context)
+        _refresh_environment_visibility(context)
         
         # Report status
         if enabled_count > 0:
@@ -919,12 +1139,12 @@ class MAPGEO_OT_set_quality(bpy.types.Operator):
     )
     
     def execute(self, context):
-        count = 0
+        mesh_objs = list(_iter_selected_meshes(context))
+        quality = self.quality
         
-        for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                obj["quality"] = self.quality
-                count += 1
+        for obj in mesh_objs:
+            obj["quality"] = quality
+        count = len(mesh_objs)
         
         self.report({'INFO'}, f"Set quality to {self.quality} for {count} objects")
         return {'FINISHED'}
@@ -940,17 +1160,15 @@ class MAPGEO_OT_toggle_bush(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
     
     def execute(self, context):
-        count = 0
-        enabled_count = 0
+        mesh_objs = list(_iter_selected_meshes(context))
         
-        for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                # Toggle or initialize bush flag
-                current = obj.get("is_bush", False)
-                obj["is_bush"] = not current
-                if not current:
-                    enabled_count += 1
-                count += 1
+        # Toggle or initialize bush flag
+        new_vals = [not o.get("is_bush", False) for o in mesh_objs]
+        for obj, value in zip(mesh_objs, new_vals):
+            obj["is_bush"] = value
+        
+        count = len(mesh_objs)
+        enabled_count = sum(new_vals)
         
         self.report({'INFO'}, f"Toggled bush flag: {enabled_count} enabled, {count-enabled_count} disabled")
         return {'FINISHED'}
@@ -965,12 +1183,12 @@ class MAPGEO_OT_assign_bush(bpy.types.Operator):
     enable: bpy.props.BoolProperty(default=True)
     
     def execute(self, context):
-        count = 0
+        mesh_objs = list(_iter_selected_meshes(context))
+        enable = self.enable
         
-        for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                obj["is_bush"] = self.enable
-                count += 1
+        for obj in mesh_objs:
+            obj["is_bush"] = enable
+        count = len(mesh_objs)
         
         status = "enabled" if self.enable else "disabled"
         self.report({'INFO'}, f"Bush flag {status} for {count} objects")
@@ -992,23 +1210,19 @@ class MAPGEO_OT_assign_baron_hash(bpy.types.Operator):
     
     def execute(self, context):
         # Validate hex input
-        if len(self.baron_hash) != 8:
-            self.report({'ERROR'}, "Baron hash must be exactly 8 hex characters")
+        hash_upper = _normalize_hex8(self.baron_hash)
+        if hash_upper is None:
+            self.report({'ERROR'}, "Baron hash must be exactly 8 hex characters (0-9, A-F)")
             return {'CANCELLED'}
         
-        try:
-            int(self.baron_hash, 16)
-        except ValueError:
-            self.report({'ERROR'}, "Invalid hex format. Use characters 0-9 and A-F only")
-            return {'CANCELLED'}
+        mesh_objs = list(_iter_selected_meshes(context))
         
-        count = 0
-        for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                obj["baron_hash"] = self.baron_hash.upper()
-                count += 1
+        for obj in mesh_objs:
+            if obj.get("baron_hash") != hash_upper:
+                obj["baron_hash"] = hash_upper
+        count = len(mesh_objs)
         
-        self.report({'INFO'}, f"Assigned baron hash {self.baron_hash.upper()} to {count} objects")
+        self.report({'INFO'}, f"Assigned baron hash {hash_upper} to {count} objects")
         return {'FINISHED'}
     
     def invoke(self, context, event):
@@ -1030,23 +1244,19 @@ class MAPGEO_OT_assign_render_region_hash(bpy.types.Operator):
     
     def execute(self, context):
         # Validate hex input
-        if len(self.render_region_hash) != 8:
-            self.report({'ERROR'}, "Render region hash must be exactly 8 hex characters")
+        hash_upper = _normalize_hex8(self.render_region_hash)
+        if hash_upper is None:
+            self.report({'ERROR'}, "Render region hash must be exactly 8 hex characters (0-9, A-F)")
             return {'CANCELLED'}
         
-        try:
-            int(self.render_region_hash, 16)
-        except ValueError:
-            self.report({'ERROR'}, "Invalid hex format. Use characters 0-9 and A-F only")
-            return {'CANCELLED'}
+        mesh_objs = list(_iter_selected_meshes(context))
         
-        count = 0
-        for obj in context.selected_objects:
-            if obj.type == 'MESH':
-                obj["render_region_hash"] = self.render_region_hash.upper()
-                count += 1
+        for obj in mesh_objs:
+            if obj.get("render_region_hash") != hash_upper:
+                obj["render_region_hash"] = hash_upper
+        count = len(mesh_objs)
         
-        self.report({'INFO'}, f"Assigned render region hash {self.render_region_hash.upper()} to {count} objects")
+        self.report({'INFO'}, f"Assigned render region hash {hash_upper} to {count} objects")
         return {'FINISHED'}
     
     def invoke(self, context, event):
@@ -1062,13 +1272,10 @@ class MAPGEO_OT_set_test_paths(bpy.types.Operator):
     def execute(self, context):
         settings = context.scene.mapgeo_settings
         
-        # Set testing paths
-        # Note: If using Map11LEVELS.wad (separate file), adjust paths accordingly
-        # Levels folder should point to where grass tint textures live (will search recursively)
-        settings.assets_folder = r"C:\Riot Games\League of Legends\Game\DATA\FINAL\Maps\Shipping\Map11.wad\assets"
-        settings.levels_folder = r"C:\Riot Games\League of Legends\Game\DATA\FINAL\Maps\Shipping\Map11.wad\levels"
-        settings.materials_json_path = r"C:\Riot Games\League of Legends\Game\DATA\FINAL\Maps\Shipping\Map11.wad\data\maps\mapgeometry\map11\base_srx.materials.bin.json"
-        settings.map_py_path = ""
+        # Set testing paths (skip RNA writes for values that are already set)
+        for prop_name, value in _TEST_PATHS:
+            if getattr(settings, prop_name) != value:
+                setattr(settings, prop_name, value)
         
         self.report({'INFO'}, "Test paths set for Map11")
         return {'FINISHED'}
@@ -1084,14 +1291,20 @@ class MAPGEO_OT_show_all(bpy.types.Operator):
         count = 0
         for obj in context.scene.objects:
             if obj.type == 'MESH':
-                obj.hide_viewport = False
-                obj.hide_render = False
-                try:
-                    obj.hide_set(False)
-                except:
-                    pass
+                # Only write flags that actually change
+                if obj.hide_viewport:
+                    obj.hide_viewport = False
+                if obj.hide_render:
+                    obj.hide_render = False
                 count += 1
         
+        # hide_set() only works for objects in the view layer, so iterate
+        # those directly instead of guarding every call with try/except
+        view_layer = context.view_layer
+        for obj in view_layer.objects:
+            if obj.type == 'MESH' and obj.hide_get(view_layer=view_layer):
+                obj.hide_set(False, view_layer=view_layer)
+        
         self.report({'INFO'}, f"Showing all {count} mesh objects")
         return {'FINISHED'}
 
@@ -1122,6 +1335,98 @@ class MAPGEO_OT_toggle_bucket_grid_selectable(bpy.types.Operator):
         return {'FINISHED'}
 
 
+def _world_mesh_data(mesh, matrix_world):
+    """Return (world_co, tri_verts) for mesh's loop triangles
+
+    world_co is a (V, 3) array of world-space vertex positions and tri_verts
+    a (T, 3) array of vertex indices per triangle. Both are read with
+    foreach_get and transformed in one matrix product instead of
+    per-vertex Vector math. mesh.calc_loop_triangles() must have been called.
+    """
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    tri_verts = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tri_verts)
+
+    m = np.array(matrix_world, dtype=np.float64)
+    world_co = co.reshape(-1, 3) @ m[:3, :3].T + m[:3, 3]
+    return world_co, tri_verts.reshape(-1, 3)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _scatter_bucket_touches_kernel(bucket_min, span, first_touch, buckets_per_side, out_tri, out_cell):
+        # Each triangle writes its own slice starting at first_touch[t]
+        for t in prange(len(bucket_min)):
+            idx = first_touch[t]
+            for dy in range(span[t, 1]):
+                row = (bucket_min[t, 1] + dy) * buckets_per_side + bucket_min[t, 0]
+                for dx in range(span[t, 0]):
+                    out_tri[idx] = t
+                    out_cell[idx] = row + dx
+                    idx += 1
+
+
+def _scatter_bucket_touches(bucket_min, span, buckets_per_side):
+    """Expand every triangle into the buckets its X/Y bounds touch
+    
+    bucket_min and span are (T, 2) arrays of each triangle's first bucket and
+    bucket count along X/Y. Returns (touch_tri, touch_cell): one entry per
+    (triangle, bucket) pair, in triangle order, with the row-major bucket
+    index (by * N + bx).
+    """
+    cells_per_tri = span[:, 0] * span[:, 1]
+    first_touch = np.cumsum(cells_per_tri) - cells_per_tri
+    
+    if NUMBA_AVAILABLE:
+        total = int(cells_per_tri.sum())
+        touch_tri = np.empty(total, dtype=np.int64)
+        touch_cell = np.empty(total, dtype=np.int64)
+        _scatter_bucket_touches_kernel(bucket_min, span, first_touch, buckets_per_side, touch_tri, touch_cell)
+        return touch_tri, touch_cell
+    
+    touch_tri = np.repeat(np.arange(len(span)), cells_per_tri)
+    local = np.arange(len(touch_tri)) - np.repeat(first_touch, cells_per_tri)
+    width = np.repeat(span[:, 0], cells_per_tri)
+    touch_bx = np.repeat(bucket_min[:, 0], cells_per_tri) + local % width
+    touch_by = np.repeat(bucket_min[:, 1], cells_per_tri) + local // width
+    return touch_tri, touch_by * buckets_per_side + touch_bx
+
+
+# Materials shared by every custom bucket grid (and kept between runs)
+_BUCKET_GRID_MAT_NAME = "BucketGrid_CustomMaterial"
+_BBOX_MAT_NAME = "BucketGrid_CustomBounds"
+
+
+def _ensure_bucket_grid_material(name, show_transparent_back=True):
+    """Get or create the translucent vermillion material used by custom bucket grids"""
+    materials = bpy.data.materials
+    existing = materials.get(name)
+    if existing is not None:
+        return existing
+    
+    mat = materials.new(name=name)
+    mat.use_nodes = True
+    mat.blend_method = 'BLEND'
+    mat.show_transparent_back = show_transparent_back
+    
+    node_tree = mat.node_tree
+    nodes = node_tree.nodes
+    nodes.clear()
+    
+    bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
+    bsdf.location = (0, 0)
+    bsdf_inputs = bsdf.inputs
+    bsdf_inputs['Base Color'].default_value = (0.935752, 0.055, 0.0, 1.0)  # Vermillion
+    bsdf_inputs['Alpha'].default_value = 0.04
+    
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+    output.location = (200, 0)
+    
+    node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
+    return mat
+
+
 class MAPGEO_OT_create_bucket_grid(bpy.types.Operator):
     """Create a custom bucket grid from the current mesh objects in the scene"""
     bl_idname = "mapgeo.create_bucket_grid"
@@ -1157,93 +1462,98 @@ class MAPGEO_OT_create_bucket_grid(bpy.types.Operator):
         layout.prop(self, "height")
     
     def execute(self, context):
-        import mathutils
-        import bmesh
-        from collections import defaultdict
+        # Datablock collections used throughout, looked up once
+        data_collections = bpy.data.collections
+        data_objects = bpy.data.objects
+        data_meshes = bpy.data.meshes
+        scene = context.scene
         
         # Keywords to ignore when creating bucket grids
-        ignore_keywords = ['sun', 'fog', 'render', 'region', 'bush']
+        ignore_keywords = ('sun', 'fog', 'render', 'region', 'bush')
         
         # Collect mesh objects grouped by visibility_layer
         objects_by_layer = defaultdict(list)
         
-        for obj in context.scene.objects:
+        # Names of objects linked to bucket grid collections, gathered once
+        excluded = set()
+        for col in data_collections:
+            if col.get("is_bucket_grid_collection"):
+                excluded.update(col.objects.keys())
+        
+        # Single pass over the scene; each custom property is read once
+        for obj in scene.objects:
             if obj.type != 'MESH':
                 continue
-            if obj.get("is_bucket_grid") or obj.get("is_bucket_grid_bounds"):
-                continue
-                
-            # Skip objects in bucket grid collections
-            in_bucket_collection = False
-            for col in obj.users_collection:
-                if col.get("is_bucket_grid_collection"):
-                    in_bucket_collection = True
-                    break
-            if in_bucket_collection:
-                continue
+            get = obj.get
             
-            # Skip bushes and render region meshes (by custom properties)
-            if obj.get("is_bush", False):
+            # Skip bucket grids and their bounds, bushes and render region
+            # meshes (by custom properties)
+            if (get("is_bucket_grid") or get("is_bucket_grid_bounds")
+                    or get("is_bush", False) or get("render_region_hash")):
                 continue
-            if obj.get("render_region_hash"):
+            
+            # Skip objects in bucket grid collections
+            obj_name = obj.name
+            if obj_name in excluded:
                 continue
             
             # Skip objects with ignored keywords in name (fallback)
-            obj_name_lower = obj.name.lower()
-            should_ignore = any(keyword in obj_name_lower for keyword in ignore_keywords)
-            if should_ignore:
+            obj_name_lower = obj_name.lower()
+            if any(keyword in obj_name_lower for keyword in ignore_keywords):
                 continue
             
             # Group by visibility_layer
-            visibility_layer = obj.get("visibility_layer", 0)
-            objects_by_layer[visibility_layer].append(obj)
+            objects_by_layer[get("visibility_layer", 0)].append(obj)
         
         if not objects_by_layer:
             self.report({'WARNING'}, "No valid mesh objects found to create bucket grid from")
             return {'CANCELLED'}
         
-        # Find parent collection for bucket grids
-        parent_collection = context.scene.collection
-        for col in bpy.data.collections:
-            if "_Meshes" in col.name:
-                # Find the parent of the _Meshes collection
-                for parent_col in bpy.data.collections:
-                    if col.name in [c.name for c in parent_col.children]:
-                        parent_collection = parent_col
-                        break
-                break
+        # Find parent collection for bucket grids: the parent of the first
+        # "_Meshes" collection, via a child -> parent map built once
+        parent_collection = scene.collection
+        meshes_col = next((col for col in data_collections if "_Meshes" in col.name), None)
+        if meshes_col is not None:
+            parent_of = {}
+            for parent_col in data_collections:
+                for child in parent_col.children:
+                    parent_of.setdefault(child.name, parent_col)
+            parent_collection = parent_of.get(meshes_col.name, parent_collection)
         
         # Remove existing custom bucket grid collections
         to_remove = []
-        for col in bpy.data.collections:
+        for col in data_collections:
             if col.get("is_bucket_grid_collection") and col.get("is_custom_bucket_grid"):
                 to_remove.append(col)
         
         for col in to_remove:
             for obj in list(col.objects):
-                bpy.data.objects.remove(obj, do_unlink=True)
-            bpy.data.collections.remove(col)
+                data_objects.remove(obj, do_unlink=True)
+            data_collections.remove(col)
+        
+        # One grid material and one bounds material shared by every layer,
+        # reused from earlier runs when they already exist
+        grid_mat = _ensure_bucket_grid_material(_BUCKET_GRID_MAT_NAME, show_transparent_back=False)
+        bbox_mat = _ensure_bucket_grid_material(_BBOX_MAT_NAME)
         
         # Process each visibility layer separately
         total_grids_created = 0
+        depsgraph = context.evaluated_depsgraph_get()
         
-        for visibility_layer in sorted(objects_by_layer.keys()):
+        layers = sorted(objects_by_layer)
+        for visibility_layer in layers:
             mesh_objects = objects_by_layer[visibility_layer]
             
             # Calculate scene bounds from layer's mesh objects
-            all_min = mathutils.Vector((float('inf'), float('inf'), float('inf')))
-            all_max = mathutils.Vector((float('-inf'), float('-inf'), float('-inf')))
-            
-            for obj in mesh_objects:
-                # Use world-space bounding box
-                for corner in obj.bound_box:
-                    world_co = obj.matrix_world @ mathutils.Vector(corner)
-                    all_min.x = min(all_min.x, world_co.x)
-                    all_min.y = min(all_min.y, world_co.y)
-                    all_min.z = min(all_min.z, world_co.z)
-                    all_max.x = max(all_max.x, world_co.x)
-                    all_max.y = max(all_max.y, world_co.y)
-                    all_max.z = max(all_max.z, world_co.z)
+            # (world-space bounding box corners of all objects at once)
+            corners = np.array([obj.bound_box for obj in mesh_objects], dtype=np.float64)
+            matrices = np.array([obj.matrix_world for obj in mesh_objects], dtype=np.float64)
+            world_corners = (
+                np.einsum('kij,kcj->kci', matrices[:, :3, :3], corners)
+                + matrices[:, None, :3, 3]
+            ).reshape(-1, 3)
+            all_min = world_corners.min(axis=0).tolist()
+            all_max = world_corners.max(axis=0).tolist()
             
             # Bucket grid uses X/Y plane in Blender (mapgeo X/Z horizontal → Blender X/Y horizontal)
             # Blender: X/Y is horizontal ground plane, Z is up
@@ -1251,10 +1561,10 @@ class MAPGEO_OT_create_bucket_grid(bpy.types.Operator):
             
             # Calculate grid dimensions (using X and Y for horizontal plane)
             # Expand bounds slightly to ensure all geometry is contained
-            min_x = all_min.x - 1.0
-            min_y = all_min.y - 1.0
-            max_x = all_max.x + 1.0
-            max_y = all_max.y + 1.0
+            min_x = all_min[0] - 1.0
+            min_y = all_min[1] - 1.0
+            max_x = all_max[0] + 1.0
+            max_y = all_max[1] + 1.0
             
             range_x = max_x - min_x
             range_y = max_y - min_y
@@ -1268,152 +1578,118 @@ class MAPGEO_OT_create_bucket_grid(bpy.types.Operator):
                 buckets_per_side = self.MAX_GRID_SIZE
                 bucket_size = max_range / buckets_per_side
             
-            # Collect all triangles in world space from mesh objects
-            all_triangles = []  # List of (v0, v1, v2, source_obj)
+            # Collect all vertices (world space) and triangles from mesh objects;
+            # triangle vertex indices are global into the concatenated vertices
+            vert_chunks = []
+            tri_chunks = []
+            vert_offset = 0
             
             for obj in mesh_objects:
-                # Get mesh in world space
-                depsgraph = context.evaluated_depsgraph_get()
-                eval_obj = obj.evaluated_get(depsgraph)
-                mesh = eval_obj.to_mesh()
-                
-                if not mesh.polygons:
-                    eval_obj.to_mesh_clear()
-                    continue
-                
-                mesh.calc_loop_triangles()
+                # Only objects whose evaluated mesh can differ from their data
+                # need a temporary evaluated copy
+                eval_obj = None
+                if obj.modifiers or obj.data.shape_keys:
+                    eval_obj = obj.evaluated_get(depsgraph)
+                    mesh = eval_obj.to_mesh()
+                else:
+                    mesh = obj.data
                 
-                # Transform to world space
-                matrix = obj.matrix_world
-                for tri in mesh.loop_triangles:
-                    v0 = matrix @ mesh.vertices[tri.vertices[0]].co
-                    v1 = matrix @ mesh.vertices[tri.vertices[1]].co
-                    v2 = matrix @ mesh.vertices[tri.vertices[2]].co
-                    all_triangles.append((v0.copy(), v1.copy(), v2.copy(), obj))
+                if mesh.polygons:
+                    mesh.calc_loop_triangles()
+                    world_co, tri_verts = _world_mesh_data(mesh, obj.matrix_world)
+                    vert_chunks.append(world_co)
+                    tri_chunks.append(tri_verts.astype(np.int64) + vert_offset)
+                    vert_offset += len(world_co)
                 
-                eval_obj.to_mesh_clear()
+                if eval_obj is not None:
+                    eval_obj.to_mesh_clear()
             
-            if not all_triangles:
+            if not tri_chunks:
                 continue  # Skip this layer if no triangles
             
-            # Build 2D bucket grid structure
-            # Each bucket stores: list of triangle indices that touch it
-            bucket_triangles = [[[] for _ in range(buckets_per_side)] for _ in range(buckets_per_side)]
+            world_verts = np.concatenate(vert_chunks)
+            tri_verts = np.concatenate(tri_chunks)
+            tris = world_verts[tri_verts]  # (triangle, corner, xyz)
             
-            # Determine which bucket each triangle belongs to
-            for tri_idx, (v0, v1, v2, obj) in enumerate(all_triangles):
-                # Find bounding box of triangle in X/Y plane (Blender horizontal)
-                tri_min_x = min(v0.x, v1.x, v2.x)
-                tri_max_x = max(v0.x, v1.x, v2.x)
-                tri_min_y = min(v0.y, v1.y, v2.y)
-                tri_max_y = max(v0.y, v1.y, v2.y)
-                
-                # Convert to bucket indices
-                bucket_min_x = max(0, int((tri_min_x - min_x) / bucket_size))
-                bucket_max_x = min(buckets_per_side - 1, int((tri_max_x - min_x) / bucket_size))
-                bucket_min_y = max(0, int((tri_min_y - min_y) / bucket_size))
-                bucket_max_y = min(buckets_per_side - 1, int((tri_max_y - min_y) / bucket_size))
-                
-                # Determine if triangle is fully inside one bucket or sticks out
-                # For simplicity: if it touches only one bucket, it's inside; otherwise it's sticking out
-                touches_single_bucket = (bucket_min_x == bucket_max_x and bucket_min_y == bucket_max_y)
-                
-                # Add triangle to all buckets it touches
-                for by in range(bucket_min_y, bucket_max_y + 1):
-                    for bx in range(bucket_min_x, bucket_max_x + 1):
-                        bucket_triangles[by][bx].append((tri_idx, touches_single_bucket))
+            # Bucket range touched by each triangle's X/Y bounding box
+            # (Blender horizontal plane), computed for all triangles at once
+            origin = np.array((min_x, min_y))
+            tri_min = tris[:, :, :2].min(axis=1)
+            tri_max = tris[:, :, :2].max(axis=1)
+            bucket_min = np.maximum(((tri_min - origin) / bucket_size).astype(np.int64), 0)
+            bucket_max = np.minimum(((tri_max - origin) / bucket_size).astype(np.int64), buckets_per_side - 1)
+            
+            # Determine if triangle is fully inside one bucket or sticks out
+            # For simplicity: if it touches only one bucket, it's inside; otherwise it's sticking out
+            touches_single = (bucket_min == bucket_max).all(axis=1)
+            
+            # Expand every triangle into the buckets it touches and group the
+            # (bucket, triangle) pairs by bucket, CSR style: the triangles of
+            # bucket b (row-major, by * N + bx) are bucket_tris[offsets[b]:offsets[b + 1]]
+            span = np.maximum(bucket_max - bucket_min + 1, 0)
+            touch_tri, touch_cell = _scatter_bucket_touches(bucket_min, span, buckets_per_side)
+            
+            # Stable sort keeps each bucket's triangles in triangle order
+            bucket_count = buckets_per_side * buckets_per_side
+            order = np.argsort(touch_cell, kind='stable')
+            bucket_tris = touch_tri[order]
+            tri_counts = np.bincount(touch_cell, minlength=bucket_count)
+            offsets = np.zeros(bucket_count + 1, dtype=np.int64)
+            np.cumsum(tri_counts, out=offsets[1:])
+            
+            # Per-bucket fields, flat row-major (by * N + bx), filled from the
+            # touch arrays directly: inside counts come from the touches of
+            # single-bucket triangles, and each bucket's indices start at
+            # three per preceding triangle
+            bucket_inside = np.bincount(
+                touch_cell[touches_single[touch_tri]], minlength=bucket_count
+            ).astype(np.int32)
+            bucket_sticking = tri_counts.astype(np.int32) - bucket_inside
+            bucket_start_index = (offsets[:-1] * 3).astype(np.int32)
+            bucket_base_vertex = np.zeros(bucket_count, dtype=np.int32)
             
             # Build unified vertex and index buffers with base_vertex offsets
             all_vertices = []  # Global vertex buffer
             all_indices = []   # Global index buffer
-            bucket_data = [[None for _ in range(buckets_per_side)] for _ in range(buckets_per_side)]
+            offsets = offsets.tolist()
             
-            for bz in range(buckets_per_side):
-                for bx in range(buckets_per_side):
-                    tri_list = bucket_triangles[bz][bx]
-                    if not tri_list:
-                        # Empty bucket
-                        bucket_data[bz][bx] = {
-                            'base_vertex': 0,
-                            'start_index': len(all_indices),
-                            'inside_face_count': 0,
-                            'sticking_out_face_count': 0
-                        }
-                        continue
+            for bucket_idx in np.flatnonzero(tri_counts).tolist():
+                lo = offsets[bucket_idx]
+                hi = offsets[bucket_idx + 1]
                 
-                # Build local vertex list for this bucket (deduplication)
-                    local_verts = []
-                    vertex_map = {}  # maps (tri_idx, vert_idx_in_tri) -> local_vert_idx
-                    local_indices = []
-                    inside_count = 0
-                    sticking_out_count = 0
-                    
-                    for tri_idx, is_inside in tri_list:
-                        v0, v1, v2, obj = all_triangles[tri_idx]
-                        
-                        # Add vertices (with deduplication)
-                        def get_or_add_vertex(v, key):
-                            if key not in vertex_map:
-                                vertex_map[key] = len(local_verts)
-                                local_verts.append(v)
-                            return vertex_map[key]
-                        
-                        idx0 = get_or_add_vertex(v0, (tri_idx, 0))
-                        idx1 = get_or_add_vertex(v1, (tri_idx, 1))
-                        idx2 = get_or_add_vertex(v2, (tri_idx, 2))
-                        
-                        # Add face (note: Blender uses CCW, but we'll reverse on import)
-                        local_indices.extend([idx0, idx1, idx2])
-                        
-                        if is_inside:
-                            inside_count += 1
-                        else:
-                            sticking_out_count += 1
-                    
-                    # Store bucket data
-                    base_vertex = len(all_vertices)
-                    start_index = len(all_indices)
-                    
-                    bucket_data[bz][bx] = {
-                        'base_vertex': base_vertex,
-                        'start_index': start_index,
-                        'inside_face_count': inside_count,
-                        'sticking_out_face_count': sticking_out_count
-                    }
-                    
-                    # Append to global buffers
-                    all_vertices.extend(local_verts)
-                    all_indices.extend(local_indices)
+                # Build local vertex list for this bucket, sharing vertices
+                # between the bucket's triangles (keyed by source vertex, so
+                # no triangle ever references the same local vertex twice)
+                corner_ids = tri_verts[bucket_tris[lo:hi]].ravel()
+                unique_ids, local_indices = np.unique(corner_ids, return_inverse=True)
+                bucket_base_vertex[bucket_idx] = len(all_vertices)
+                
+                # Append to global buffers
+                all_vertices.extend(world_verts[unique_ids].tolist())
+                all_indices.extend(local_indices.ravel().tolist())
             
             # Create bucket grid mesh (unified mesh with all geometry)
             layer_suffix = f"_L{visibility_layer}" if visibility_layer != 0 else ""
-            grid_mesh = bpy.data.meshes.new(f"CustomBucketGrid{layer_suffix}_Mesh")
-            
-            # Build faces from indices with base_vertex offsets
-            faces = []
-            for bz in range(buckets_per_side):
-                for bx in range(buckets_per_side):
-                    bucket = bucket_data[bz][bx]
-                    face_count = bucket['inside_face_count'] + bucket['sticking_out_face_count']
-                    start_idx = bucket['start_index']
-                    base_vertex = bucket['base_vertex']
-                    
-                    for i in range(face_count):
-                        idx_pos = start_idx + (i * 3)
-                        v0 = all_indices[idx_pos] + base_vertex
-                        v1 = all_indices[idx_pos + 1] + base_vertex
-                        v2 = all_indices[idx_pos + 2] + base_vertex
-                        faces.append((v0, v1, v2))
+            grid_mesh = data_meshes.new(f"CustomBucketGrid{layer_suffix}_Mesh")
             
-            # Convert vertices to tuples
-            verts = [(v.x, v.y, v.z) for v in all_vertices]
+            # Build faces from indices with base_vertex offsets: every face of
+            # a bucket is offset by that bucket's base vertex
+            face_base_vertex = np.repeat(bucket_base_vertex, bucket_inside + bucket_sticking)
+            faces = np.asarray(all_indices, dtype=np.int32).reshape(-1, 3) + face_base_vertex[:, None]
             
-            grid_mesh.from_pydata(verts, [], faces)
-            grid_mesh.update()
+            # Fill the mesh directly (all triangles) instead of from_pydata
+            face_count = len(faces)
+            grid_mesh.vertices.add(len(all_vertices))
+            grid_mesh.vertices.foreach_set("co", np.asarray(all_vertices, dtype=np.float32).ravel())
+            grid_mesh.loops.add(face_count * 3)
+            grid_mesh.loops.foreach_set("vertex_index", faces.ravel())
+            grid_mesh.polygons.add(face_count)
+            grid_mesh.polygons.foreach_set("loop_start", np.arange(0, face_count * 3, 3, dtype=np.int32))
+            grid_mesh.update(calc_edges=True)
             
             # Create new bucket grid collection
             bg_col_name = f"Custom_BucketGrid{layer_suffix}"
-            bg_collection = bpy.data.collections.new(bg_col_name)
+            bg_collection = data_collections.new(bg_col_name)
             parent_collection.children.link(bg_collection)
             bg_collection["is_bucket_grid_collection"] = True
             bg_collection["is_custom_bucket_grid"] = True
@@ -1421,33 +1697,11 @@ class MAPGEO_OT_create_bucket_grid(bpy.types.Operator):
             bg_collection["visibility_layer"] = visibility_layer
             
             # Create bucket grid object
-            grid_obj = bpy.data.objects.new(f"CustomBucketGrid{layer_suffix}_Mesh", grid_mesh)
+            grid_obj = data_objects.new(f"CustomBucketGrid{layer_suffix}_Mesh", grid_mesh)
             bg_collection.objects.link(grid_obj)
             
-            # Apply crimson red material (matching imported bucket grids)
-            mat_name = f"BucketGrid_CustomMaterial{layer_suffix}"
-            if mat_name in bpy.data.materials:
-                bpy.data.materials.remove(bpy.data.materials[mat_name])
-            
-            mat = bpy.data.materials.new(name=mat_name)
-            mat.use_nodes = True
-            mat.blend_method = 'BLEND'
-            mat.show_transparent_back = False
-            
-            nodes = mat.node_tree.nodes
-            nodes.clear()
-            
-            bsdf = nodes.new(type='ShaderNodeBsdfPrincipled')
-            bsdf.location = (0, 0)
-            bsdf.inputs['Base Color'].default_value = (0.935752, 0.055, 0.0, 1.0)  # Vermillion
-            bsdf.inputs['Alpha'].default_value = 0.04
-            
-            output = nodes.new(type='ShaderNodeOutputMaterial')
-            output.location = (200, 0)
-            
-            mat.node_tree.links.new(bsdf.outputs['BSDF'], output.inputs['Surface'])
-            
-            grid_mesh.materials.append(mat)
+            # Shared crimson red material (matching imported bucket grids)
+            grid_mesh.materials.append(grid_mat)
             
             # Store metadata on object
             grid_obj["is_bucket_grid"] = True
@@ -1462,27 +1716,16 @@ class MAPGEO_OT_create_bucket_grid(bpy.types.Operator):
             grid_obj["buckets_per_side"] = buckets_per_side
             grid_obj["bounds_height"] = self.height
             
-            # Store bucket data as JSON for export
-            bucket_data_json = []
-            for bz in range(buckets_per_side):
-                row = []
-                for bx in range(buckets_per_side):
-                    bucket = bucket_data[bz][bx]
-                    row.append({
-                        'base_vertex': bucket['base_vertex'],
-                        'start_index': bucket['start_index'],
-                        'inside_face_count': bucket['inside_face_count'],
-                        'sticking_out_face_count': bucket['sticking_out_face_count']
-                    })
-                bucket_data_json.append(row)
-            
-            import json
-            grid_obj["bucket_data"] = json.dumps(bucket_data_json)
+            # Store bucket data as packed int32 arrays for export (row-major)
+            grid_obj["bucket_data_base_vertex"] = bucket_base_vertex.tobytes()
+            grid_obj["bucket_data_start_index"] = bucket_start_index.tobytes()
+            grid_obj["bucket_data_inside_count"] = bucket_inside.tobytes()
+            grid_obj["bucket_data_sticking_count"] = bucket_sticking.tobytes()
             grid_obj["vertex_count"] = len(all_vertices)
             grid_obj["index_count"] = len(all_indices)
             
             # Create bounding box visual (flat on X/Y plane at specified Z height)
-            bbox_mesh = bpy.data.meshes.new(f"CustomBucketGrid{layer_suffix}_Bounds")
+            bbox_mesh = data_meshes.new(f"CustomBucketGrid{layer_suffix}_Bounds")
             z_height = self.height
             
             # Single horizontal rectangle on X/Y plane at specified Z height
@@ -1498,49 +1741,24 @@ class MAPGEO_OT_create_bucket_grid(bpy.types.Operator):
             bbox_mesh.from_pydata(bbox_verts, bbox_edges, [])
             bbox_mesh.update()
             
-            bbox_obj = bpy.data.objects.new(f"CustomBucketGrid{layer_suffix}_Bounds", bbox_mesh)
+            bbox_obj = data_objects.new(f"CustomBucketGrid{layer_suffix}_Bounds", bbox_mesh)
             bg_collection.objects.link(bbox_obj)
             
-            # Apply vermillion material to bounding box
-            bbox_mat_name = f"BucketGrid_CustomBounds{layer_suffix}"
-            if bbox_mat_name in bpy.data.materials:
-                bpy.data.materials.remove(bpy.data.materials[bbox_mat_name])
-            
-            bbox_mat = bpy.data.materials.new(name=bbox_mat_name)
-            bbox_mat.use_nodes = True
-            bbox_mat.blend_method = 'BLEND'
-            
-            bbox_nodes = bbox_mat.node_tree.nodes
-            bbox_nodes.clear()
-            
-            bbox_bsdf = bbox_nodes.new(type='ShaderNodeBsdfPrincipled')
-            bbox_bsdf.location = (0, 0)
-            bbox_bsdf.inputs['Base Color'].default_value = (0.935752, 0.055, 0.0, 1.0)  # Vermillion
-            bbox_bsdf.inputs['Alpha'].default_value = 0.04
-            
-            bbox_output = bbox_nodes.new(type='ShaderNodeOutputMaterial')
-            bbox_output.location = (200, 0)
-            
-            bbox_mat.node_tree.links.new(bbox_bsdf.outputs['BSDF'], bbox_output.inputs['Surface'])
-            
             bbox_mesh.materials.append(bbox_mat)
             bbox_obj.hide_select = True
             bbox_obj["is_bucket_grid_bounds"] = True
             bbox_obj["is_custom_bucket_grid"] = True
             bbox_obj["visibility_layer"] = visibility_layer
             
-            # Count populated buckets for this layer
-            populated_buckets = sum(1 for row in bucket_data for bucket in row if bucket['inside_face_count'] + bucket['sticking_out_face_count'] > 0)
-            
             total_grids_created += 1
         
         # Show the bucket grid collections
-        settings = context.scene.mapgeo_settings
+        settings = scene.mapgeo_settings
         settings.show_bucket_grid = True
         
         self.report({'INFO'}, 
             f"Created {total_grids_created} custom bucket grid(s) for layers: "
-            f"{', '.join(str(layer) for layer in sorted(objects_by_layer.keys()))}")
+            f"{', '.join(map(str, layers))}")
         return {'FINISHED'}
 
 
@@ -1551,29 +1769,36 @@ class MAPGEO_OT_show_not_used(bpy.types.Operator):
     bl_options = {'REGISTER', 'UNDO'}
     
     def execute(self, context):
-        used_count = 0
-        unused_count = 0
-        
-        for obj in context.scene.objects:
-            if obj.type == 'MESH':
-                visibility_layer = obj.get("visibility_layer", 0)
-                has_baron_hash = ("baron_hash" in obj and obj["baron_hash"] != "00000000")
-                
-                # Object is "used" if it has a visibility layer or a baron hash
-                is_used = (visibility_layer != 0) or has_baron_hash
-                
-                if is_used:
-                    obj.hide_viewport = True
-                    obj.hide_render = True
-                    used_count += 1
-                else:
-                    obj.hide_viewport = False
-                    obj.hide_render = False
-                    try:
-                        obj.hide_set(False)
-                    except:
-                        pass
-                    unused_count += 1
+        # hide_set() only works for objects in the view layer; check
+        # membership instead of guarding every call with try/except
+        view_layer = context.view_layer
+        layer_objects = view_layer.objects
+        
+        mesh_objs = [obj for obj in context.scene.objects if obj.type == 'MESH']
+        count = len(mesh_objs)
+        
+        # Object is "used" if it has a visibility layer or a baron hash;
+        # both properties are read once per object, then combined as masks
+        visibility = np.fromiter(
+            (obj.get("visibility_layer", 0) for obj in mesh_objs), dtype=np.int64, count=count
+        )
+        has_baron_hash = np.fromiter(
+            (obj.get("baron_hash", "00000000") != "00000000" for obj in mesh_objs), dtype=np.bool_, count=count
+        )
+        used = (visibility != 0) | has_baron_hash
+        used_count = int(np.count_nonzero(used))
+        unused_count = count - used_count
+        
+        for obj, is_used in zip(mesh_objs, used.tolist()):
+            # Only write flags that actually change, so untouched objects
+            # are not tagged for a depsgraph update
+            if obj.hide_viewport != is_used:
+                obj.hide_viewport = is_used
+            if obj.hide_render != is_used:
+                obj.hide_render = is_used
+            
+            if not is_used and obj.name in layer_objects and obj.hide_get(view_layer=view_layer):
+                obj.hide_set(False, view_layer=view_layer)
         
         self.report({'INFO'}, f"Showing {unused_count} unused objects ({used_count} hidden)")
         return {'FINISHED'}
@@ -1582,10 +1807,6 @@ class MAPGEO_OT_show_not_used(bpy.types.Operator):
 # Register classes
 classes = (
     VIEW3D_PT_mapgeo_panel,
-    VIEW3D_PT_mapgeo_layers_panel,
-    VIEW3D_PT_mapgeo_import_panel,
-    VIEW3D_PT_mapgeo_export_panel,
-    VIEW3D_PT_mapgeo_properties_panel,
     MAPGEO_OT_setup_mesh,
     MAPGEO_OT_initialize_custom_mesh,
     MAPGEO_OT_assign_layer,
@@ -1604,9 +1825,21 @@ classes = (
 
 def register():
     for cls in classes:
-        bpy.utils.register_class(cls)
+        if not cls.is_registered:
+            bpy.utils.register_class(cls)
+
+
+def clear_caches():
+    """Drop module-level caches (called on addon unregister/reload)"""
+    global _material_items_token
+    _parse_layer_list.cache_clear()
+    _last_import_label.cache_clear()
+    _material_items_token = None
+    _scene_counts["dirty"] = True
 
 
 def unregister():
     for cls in reversed(classes):
-        bpy.utils.unregister_class(cls)
+        if cls.is_registered:
+            bpy.utils.unregister_class(cls)
+    clear_caches()
@@ -7,6 +7,20 @@ import os
 import shutil
 import sys
 
+def remove_pycache(root):
+    """Delete every __pycache__ folder below root, returning how many were removed"""
+    removed_count = 0
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+            if entry.name == '__pycache__':
+                shutil.rmtree(entry.path)
+                removed_count += 1
+            else:
+                removed_count += remove_pycache(entry.path)
+    return removed_count
+
 def main():
     source = r"D:\BlenderAddons\MapgeoAddon"
     target = r"C:\Users\theki\AppData\Roaming\Blender Foundation\Blender\5.0\scripts\addons\MapgeoAddon"
@@ -23,26 +37,35 @@ def main():
     # Ensure target directory exists
     os.makedirs(target, exist_ok=True)
     
-    # Copy Python files
-    for item in os.listdir(source):
-        # Skip excluded items, markdown files, and test/debug scripts (starting with _)
-        if item in exclude or item.endswith('.md') or (item.startswith('_') and item != '__init__.py'):
-            continue
+    # Copy Python files (scandir gives name and type without an extra stat)
+    with os.scandir(source) as entries:
+        for entry in entries:
+            item = entry.name
+            # Skip excluded items, markdown files, and test/debug scripts (starting with _)
+            if item in exclude or item.endswith('.md') or (item.startswith('_') and item != '__init__.py'):
+                continue
+            
+            if not entry.is_file():
+                continue
             
-        source_path = os.path.join(source, item)
-        target_path = os.path.join(target, item)
-        
-        if os.path.isfile(source_path):
-            shutil.copy2(source_path, target_path)
+            target_path = os.path.join(target, item)
+            
+            # Skip files that are unchanged since the last copy
+            source_stat = entry.stat()
+            try:
+                target_stat = os.stat(target_path)
+            except FileNotFoundError:
+                target_stat = None
+            if (target_stat is not None
+                    and target_stat.st_size == source_stat.st_size
+                    and int(target_stat.st_mtime) == int(source_stat.st_mtime)):
+                continue
+            
+            shutil.copy2(entry.path, target_path)
             print(f"  Copied: {item}")
     
     # Clean all __pycache__ folders
-    removed_count = 0
-    for root, dirs, files in os.walk(target):
-        if '__pycache__' in dirs:
-            pycache_path = os.path.join(root, '__pycache__')
-            shutil.rmtree(pycache_path)
-            removed_count += 1
+    removed_count = remove_pycache(target)
     
     print(f"\n✓ Update complete!")
     print(f"✓ Cleaned {removed_count} __pycache__ folder(s)")
@@ -3,66 +3,124 @@ Utility functions for Mapgeo addon
 """
 
 import bpy
-from mathutils import Vector, Matrix
+import numpy as np
+from bpy.app.handlers import persistent
+from mathutils import Matrix
 import struct
+import sys
+import time
+
+
+# Name -> datablock caches for ensure_material / get_or_create_collection.
+# Entries are re-validated on use (renamed or removed datablocks fall back
+# to a bpy.data lookup) and dropped on file load and undo/redo, since
+# those free the datablocks the cached references point to.
+_material_cache = {}
+_collection_cache = {}
+
+
+@persistent
+def clear_data_caches(*_args):
+    """Drop cached datablock lookups (load_pre/undo_post/redo_post handler)"""
+    _material_cache.clear()
+    _collection_cache.clear()
+
+
+def _get_cached(cache, name):
+    block = cache.get(name)
+    if block is None:
+        return None
+    try:
+        if block.name == name:
+            return block
+    except ReferenceError:
+        pass  # Datablock was removed
+    del cache[name]
+    return None
+
+
+def _as_coord_array(vertices):
+    """Return vertices (Vectors, 3-tuples or an array) as an (N, 3) float64 array"""
+    return np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+
+
+def _mesh_coords(mesh):
+    """Read all vertex positions of a mesh into an (N, 3) array via foreach_get"""
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float64)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+
+def _bounding_sphere(coords):
+    if len(coords) == 0:
+        return (0.0, 0.0, 0.0), 0.0
+    
+    center = coords.mean(axis=0)
+    diffs = coords - center
+    radius = float(np.sqrt(np.einsum('ij,ij->i', diffs, diffs).max()))
+    return tuple(center.tolist()), radius
 
 
 def calculate_bounding_sphere(vertices):
     """Calculate bounding sphere for a list of vertices"""
-    if not vertices:
+    if len(vertices) == 0:
         return (0.0, 0.0, 0.0), 0.0
-    
-    # Calculate center
-    center = Vector((0.0, 0.0, 0.0))
-    for v in vertices:
-        if isinstance(v, Vector):
-            center += v
-        else:
-            center += Vector(v)
-    center /= len(vertices)
-    
-    # Calculate radius
-    radius = 0.0
-    for v in vertices:
-        if isinstance(v, Vector):
-            dist = (v - center).length
-        else:
-            dist = (Vector(v) - center).length
-        radius = max(radius, dist)
-    
-    return tuple(center), radius
+    return _bounding_sphere(_as_coord_array(vertices))
+
+
+def calculate_bounding_sphere_from_mesh(mesh):
+    """Calculate bounding sphere for a mesh's vertices (local space)"""
+    return _bounding_sphere(_mesh_coords(mesh))
+
+
+def _bounding_box(coords):
+    if len(coords) == 0:
+        return (0.0, 0.0, 0.0), (0.0, 0.0, 0.0)
+    return tuple(coords.min(axis=0).tolist()), tuple(coords.max(axis=0).tolist())
 
 
 def calculate_bounding_box(vertices):
     """Calculate axis-aligned bounding box for a list of vertices"""
-    if not vertices:
+    if len(vertices) == 0:
         return (0.0, 0.0, 0.0), (0.0, 0.0, 0.0)
+    return _bounding_box(_as_coord_array(vertices))
+
+
+def calculate_bounding_box_from_mesh(mesh):
+    """Calculate axis-aligned bounding box for a mesh's vertices (local space)"""
+    return _bounding_box(_mesh_coords(mesh))
+
+
+def _bounds(coords):
+    bbox_min, bbox_max = _bounding_box(coords)
+    center, radius = _bounding_sphere(coords)
+    return bbox_min, bbox_max, center, radius
+
+
+def calculate_bounds(vertices):
+    """Calculate bounding box and bounding sphere for a list of vertices at once
     
-    min_x = min_y = min_z = float('inf')
-    max_x = max_y = max_z = float('-inf')
-    
-    for v in vertices:
-        if isinstance(v, Vector):
-            x, y, z = v.x, v.y, v.z
-        else:
-            x, y, z = v[0], v[1], v[2]
-        
-        min_x = min(min_x, x)
-        min_y = min(min_y, y)
-        min_z = min(min_z, z)
-        max_x = max(max_x, x)
-        max_y = max(max_y, y)
-        max_z = max(max_z, z)
-    
-    return (min_x, min_y, min_z), (max_x, max_y, max_z)
+    Returns (bbox_min, bbox_max, center, radius). The vertices are converted
+    to an array only once, which is the bulk of the cost of either helper.
+    """
+    if len(vertices) == 0:
+        return (0.0, 0.0, 0.0), (0.0, 0.0, 0.0), (0.0, 0.0, 0.0), 0.0
+    return _bounds(_as_coord_array(vertices))
+
+
+def calculate_bounds_from_mesh(mesh):
+    """Calculate bounding box and bounding sphere for a mesh's vertices (local space)"""
+    return _bounds(_mesh_coords(mesh))
 
 
 def matrix_to_list(matrix):
     """Convert Blender Matrix to a flat list (row-major)"""
-    result = []
-    for row in matrix:
-        result.extend(row)
-    return result
+    return [value for row in matrix for value in row]
+
+
+def matrix_to_array(matrix):
+    """Convert Blender Matrix to a flat float64 NumPy array (row-major)"""
+    return np.array(matrix, dtype=np.float64).ravel()
 
 
 def list_to_matrix(data):
@@ -70,18 +128,15 @@ def list_to_matrix(data):
     if len(data) != 16:
         raise ValueError("Matrix data must have 16 elements")
     
-    return Matrix([
-        [data[0], data[1], data[2], data[3]],
-        [data[4], data[5], data[6], data[7]],
-        [data[8], data[9], data[10], data[11]],
-        [data[12], data[13], data[14], data[15]]
-    ])
+    return Matrix((data[0:4], data[4:8], data[8:12], data[12:16]))
 
 
 def get_or_create_collection(name, parent=None):
     """Get or create a collection with the given name"""
-    if name in bpy.data.collections:
-        return bpy.data.collections[name]
+    collection = _get_cached(_collection_cache, name) or bpy.data.collections.get(name)
+    if collection is not None:
+        _collection_cache[name] = collection
+        return collection
     
     collection = bpy.data.collections.new(name)
     
@@ -90,20 +145,36 @@ def get_or_create_collection(name, parent=None):
     else:
         bpy.context.scene.collection.children.link(collection)
     
+    _collection_cache[name] = collection
     return collection
 
 
-def select_objects(objects, active=None):
-    """Select the given objects and optionally set one as active"""
-    bpy.ops.object.select_all(action='DESELECT')
+def select_objects(objects, active=None, additive=False):
+    """Select the given objects and optionally set one as active
+    
+    Unless additive is True, the current selection is cleared first.
+    """
+    view_layer = bpy.context.view_layer
+    layer_objects = view_layer.objects
+    
+    if not additive:
+        for obj in list(layer_objects.selected):
+            obj.select_set(False)
     
     for obj in objects:
         obj.select_set(True)
     
     if active and active in objects:
-        bpy.context.view_layer.objects.active = active
+        layer_objects.active = active
     elif objects:
-        bpy.context.view_layer.objects.active = objects[0]
+        layer_objects.active = objects[0]
+
+
+def _polygon_sizes(mesh):
+    """Read every polygon's corner count into an int32 array via foreach_get"""
+    sizes = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", sizes)
+    return sizes
 
 
 def get_mesh_stats(mesh):
@@ -112,7 +183,7 @@ def get_mesh_stats(mesh):
         'vertices': len(mesh.vertices),
         'edges': len(mesh.edges),
         'faces': len(mesh.polygons),
-        'triangles': sum(1 for p in mesh.polygons if len(p.vertices) == 3),
+        'triangles': int(np.count_nonzero(_polygon_sizes(mesh) == 3)),
         'materials': len(mesh.materials),
         'uv_layers': len(mesh.uv_layers),
         'vertex_colors': len(mesh.vertex_colors),
@@ -131,7 +202,7 @@ def validate_mesh_for_export(mesh):
         errors.append("Mesh has no faces")
     
     # Check for non-triangular faces
-    non_tris = sum(1 for p in mesh.polygons if len(p.vertices) != 3)
+    non_tris = int(np.count_nonzero(_polygon_sizes(mesh) != 3))
     if non_tris > 0:
         warnings.append(f"Mesh has {non_tris} non-triangular faces (will be triangulated)")
     
@@ -180,13 +251,16 @@ def print_mapgeo_info(mapgeo):
     print("="*60 + "\n")
 
 
+_FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
 def format_file_size(size_bytes):
     """Format byte size to human readable string"""
-    for unit in ['B', 'KB', 'MB', 'GB']:
-        if size_bytes < 1024.0:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024.0
-    return f"{size_bytes:.2f} TB"
+    if size_bytes < 1024:
+        return f"{size_bytes:.2f} B"
+    # 1024 = 2**10, so the unit is the number of whole 10-bit groups
+    unit_index = min((int(size_bytes).bit_length() - 1) // 10, len(_FILE_SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (unit_index * 10)):.2f} {_FILE_SIZE_UNITS[unit_index]}"
 
 
 def clamp(value, min_value, max_value):
@@ -199,38 +273,74 @@ def lerp(a, b, t):
     return a + (b - a) * t
 
 
+def clamp_array(values, min_value, max_value):
+    """Clamp every element of an array between min and max"""
+    return np.clip(values, min_value, max_value)
+
+
+def lerp_array(a, b, t):
+    """Element-wise linear interpolation between arrays (or scalars) a and b"""
+    a = np.asarray(a)
+    return a + (np.asarray(b) - a) * t
+
+
 def vector_to_tuple(vector):
     """Convert Vector to tuple"""
-    return (vector.x, vector.y, vector.z)
+    return vector.to_tuple()
 
 
 def ensure_material(name, create_if_missing=True):
     """Get or create a material"""
-    mat = bpy.data.materials.get(name)
+    mat = _get_cached(_material_cache, name) or bpy.data.materials.get(name)
     
     if mat is None and create_if_missing:
         mat = bpy.data.materials.new(name=name)
         mat.use_nodes = True
     
+    if mat is not None:
+        _material_cache[name] = mat
     return mat
 
 
 class ProgressTracker:
-    """Simple progress tracker for long operations"""
+    """Simple progress tracker for long operations
+    
+    Progress is written on one console line and refreshed at most every
+    min_interval seconds (or when the whole percent changes), so tight
+    loops are not slowed down by console output.
+    """
+    
+    __slots__ = (
+        'total', 'current', 'description', 'min_interval',
+        '_total_inv', '_last_print_time', '_last_percent',
+    )
     
-    def __init__(self, total, description="Progress"):
+    def __init__(self, total, description="Progress", min_interval=0.1):
         self.total = total
         self.current = 0
         self.description = description
+        self.min_interval = min_interval
+        self._total_inv = 100.0 / total if total > 0 else 0.0
+        self._last_print_time = 0.0
+        self._last_percent = -1
     
     def update(self, increment=1):
         self.current += increment
         if self.total > 0:
-            percent = (self.current / self.total) * 100
-            print(f"{self.description}: {self.current}/{self.total} ({percent:.1f}%)")
+            percent = self.current * self._total_inv
+            now = time.monotonic()
+            if int(percent) == self._last_percent and now - self._last_print_time < self.min_interval:
+                return
+            self._last_percent = int(percent)
+            self._last_print_time = now
+            sys.stdout.write(f"\r{self.description}: {self.current}/{self.total} ({percent:.1f}%)")
+            sys.stdout.flush()
     
     def finish(self):
-        print(f"{self.description}: Complete!")
+        # Finish the progress line (if one was written) before reporting
+        prefix = "\n" if self._last_percent >= 0 else ""
+        sys.stdout.write(f"{prefix}{self.description}: Complete!\n")
+        sys.stdout.flush()
 
 
 # Constants
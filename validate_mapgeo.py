@@ -3,12 +3,67 @@ Mapgeo File Validation Script
 Thoroughly validates a mapgeo file to identify issues that could cause game crashes
 """
 
+import argparse
+import functools
+import itertools
+import math
+import mmap
+import os
 import struct
 import sys
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from typing import List, Dict, Iterator, NamedTuple, Optional, Tuple, Union
+from dataclasses import dataclass, field
 
-@dataclass
+# NumPy is optional; without it index validation falls back to a Python scan
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Precompiled little-endian field readers (used with unpack_from, so no
+# per-field slice of the file data is allocated)
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_F32 = struct.Struct('<f')
+_U32X2 = struct.Struct('<2I')
+_U32X3 = struct.Struct('<3I')
+_F6 = struct.Struct('<6f')
+_F16 = struct.Struct('<16f')
+# Sampler index and name length
+_SAMPLER_HEADER = struct.Struct('<iI')
+# Bucket grid bounds, max stickout, bucket size, buckets_per_side,
+# is_disabled and flags
+_BUCKET_GRID_HEADER = struct.Struct('<8fH?B')
+# Primitive start_index, index_count, min_vertex, max_vertex
+_PRIM_RANGE = struct.Struct('<4I')
+# Vertex buffer description element table: 15 (name, format) pairs
+_VB_ELEMENTS = struct.Struct('<30I')
+
+# Vertex element size in bytes, indexed by format id
+_FORMAT_SIZES = (
+    4,   # X_FLOAT32
+    8,   # XY_FLOAT32
+    12,  # XYZ_FLOAT32
+    16,  # XYZW_FLOAT32
+    4,   # BGRA_PACKED8888
+    4,   # ZYXW_PACKED8888
+    4,   # RGBA_PACKED8888
+    4,   # XY_PACKED1616
+    8,   # XYZ_PACKED161616
+    8,   # XYZW_PACKED16161616
+    2,   # XY_PACKED88
+    3,   # XYZ_PACKED888
+    4,   # XYZW_PACKED8888
+)
+
+
+@functools.lru_cache(maxsize=16)
+def _mesh_header_tail(vertex_decl_count: int) -> struct.Struct:
+    """Struct for a mesh's vertex buffer IDs plus index_count and index_buffer_id"""
+    return struct.Struct(f'<{vertex_decl_count + 2}I')
+
+@dataclass(slots=True)
 class ValidationIssue:
     """Represents a validation issue found in the file"""
     severity: str  # "ERROR", "WARNING", "INFO"
@@ -18,55 +73,157 @@ class ValidationIssue:
     offset: int = -1
     expected: str = ""
     actual: str = ""
+    count: int = 1  # Number of identical occurrences
+    rendered: str = field(default="", init=False, repr=False, compare=False)
+    
+    def render(self) -> str:
+        """Format the issue's report lines (without the repeat count)"""
+        prefix = f"[{self.category}]"
+        if self.mesh_index >= 0:
+            prefix += f" Mesh {self.mesh_index}:"
+        
+        lines = [f"{prefix} {self.message}"]
+        if self.expected:
+            lines.append(f"  Expected: {self.expected}")
+        if self.actual:
+            lines.append(f"  Actual: {self.actual}")
+        if self.offset >= 0:
+            lines.append(f"  Offset: 0x{self.offset:08X}")
+        return "\n".join(lines)
+
+class _MeshLayout(NamedTuple):
+    """Version-dependent mesh record layout (see MapgeoValidator._build_mesh_layout)"""
+    has_name: bool
+    pre_primitive_skip: int
+    backface_skip: int
+    post_quality_skip: int
+    sh_skip: int
+    light_channel_count: int
+    has_texture_overrides: bool
+
+
+class _StopParse(Exception):
+    """Raised after recording an error that leaves the rest of the file unlocatable"""
+
+
+_VERBOSITY_LEVELS = ('errors', 'warnings', 'info')
+
+# Report lines written to stdout per write call
+_REPORT_WRITE_BLOCK = 1024
+
+# Longest sampler/mesh/material name accepted before the length is treated as corrupt
+_MAX_STRING_LENGTH = 4096
+
 
 class MapgeoValidator:
     """Validates mapgeo file structure and data integrity"""
     
-    def __init__(self, filepath: str):
-        self.filepath = filepath
+    def __init__(self, source: Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap],
+                 verbosity: str = 'warnings', name: Optional[str] = None):
+        """
+        source is a file path or an already loaded buffer (bytes, mmap, ...);
+        a buffer is used as-is and left open. name labels the report and
+        defaults to the path.
+        verbosity is 'errors', 'warnings' or 'info'; lower levels are not recorded
+        """
+        if verbosity not in _VERBOSITY_LEVELS:
+            raise ValueError(f"verbosity must be one of {_VERBOSITY_LEVELS}, got {verbosity!r}")
+        if isinstance(source, (str, os.PathLike)):
+            self.filepath = os.fspath(source)
+            self.source_buffer = None
+        else:
+            self.filepath = "<buffer>"
+            self.source_buffer = source
+        if name is not None:
+            self.filepath = name
+        self.verbosity = verbosity
+        self.keep_info = verbosity == 'info'
+        self.keep_warnings = verbosity != 'errors'
         self.issues: List[ValidationIssue] = []
-        self.file_data: bytes = b''
+        self._issues_by_key: Dict[Tuple, ValidationIssue] = {}
+        self.file_data: Union[bytes, mmap.mmap] = b''
+        self.file_view: memoryview = memoryview(b'')
         self.version: int = 0
         
     def validate(self) -> List[ValidationIssue]:
         """Run full validation suite"""
         print(f"=== Validating: {self.filepath} ===\n")
         
-        # Read file
-        try:
-            with open(self.filepath, 'rb') as f:
-                self.file_data = f.read()
-        except Exception as e:
-            self.add_error("FILE", f"Failed to read file: {e}")
-            return self.issues
-        
-        print(f"File size: {len(self.file_data)} bytes\n")
+        if self.source_buffer is not None:
+            self.file_data = self.source_buffer
+        else:
+            # Map the file instead of reading it so large files aren't copied
+            # into memory up front (empty files can't be mapped)
+            try:
+                with open(self.filepath, 'rb') as f:
+                    try:
+                        self.file_data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except ValueError:
+                        self.file_data = f.read()
+            except Exception as e:
+                self.add_error("FILE", f"Failed to read file: {e}")
+                return self.issues
+        
+        # Slices of the view (buffer captures, names) don't copy the file data
+        self.file_view = memoryview(self.file_data)
         
-        # Parse and validate
         try:
-            self._validate_header()
-            self._parse_and_validate_structure()
-        except Exception as e:
-            self.add_error("PARSING", f"Critical parsing error: {e}")
-            import traceback
-            traceback.print_exc()
+            print(f"File size: {len(self.file_data)} bytes\n")
+            
+            # Parse and validate
+            try:
+                self._validate_header()
+                self._parse_and_validate_structure()
+            except Exception as e:
+                self.add_error("PARSING", f"Critical parsing error: {e}")
+                import traceback
+                traceback.print_exc()
+        finally:
+            # The view must be released before the map can be closed
+            self.file_view.release()
+            self.file_view = memoryview(b'')
+            # A caller-supplied buffer stays open; only close our own map
+            if self.source_buffer is None and isinstance(self.file_data, mmap.mmap):
+                self.file_data.close()
+            self.file_data = b''
         
         return self.issues
     
+    def _add_issue(self, severity: str, category: str, message: str, kwargs: Dict):
+        """Record an issue, folding exact repeats (same mesh, message and details) into the first occurrence's count"""
+        key = (severity, category, kwargs.get('mesh_index', -1), message,
+               kwargs.get('expected', ""), kwargs.get('actual', ""), kwargs.get('offset', -1))
+        issue = self._issues_by_key.get(key)
+        if issue is not None:
+            issue.count += 1
+            return
+        issue = ValidationIssue(severity, category, message=message, **kwargs)
+        issue.rendered = issue.render()
+        self._issues_by_key[key] = issue
+        self.issues.append(issue)
+    
     def add_error(self, category: str, message: str, **kwargs):
         """Add an error issue"""
-        issue = ValidationIssue("ERROR", category, message=message, **kwargs)
-        self.issues.append(issue)
+        self._add_issue("ERROR", category, message, kwargs)
         
     def add_warning(self, category: str, message: str, **kwargs):
         """Add a warning issue"""
-        issue = ValidationIssue("WARNING", category, message=message, **kwargs)
-        self.issues.append(issue)
+        if not self.keep_warnings:
+            return
+        self._add_issue("WARNING", category, message, kwargs)
         
     def add_info(self, category: str, message: str, **kwargs):
         """Add an info issue"""
-        issue = ValidationIssue("INFO", category, message=message, **kwargs)
-        self.issues.append(issue)
+        if not self.keep_info:
+            return
+        self._add_issue("INFO", category, message, kwargs)
+    
+    def _check_string_length(self, length: int, offset: int, category: str, label: str, **kwargs):
+        """Check a string length before slicing it; a bad length means the rest of the file can't be located"""
+        if length > _MAX_STRING_LENGTH or offset + length > len(self.file_data):
+            self.add_error(category, f"{label}: Invalid string length {length}, stopping parse",
+                           offset=offset - 4, **kwargs)
+            raise _StopParse()
     
     def _validate_header(self):
         """Validate file header"""
@@ -78,7 +235,7 @@ class MapgeoValidator:
         if magic != b'OEGM':
             self.add_error("HEADER", f"Invalid magic bytes", expected="OEGM", actual=magic.hex())
         
-        self.version = struct.unpack('<I', self.file_data[4:8])[0]
+        self.version = _U32.unpack_from(self.file_view, 4)[0]
         if self.version not in [13, 14, 15, 16, 17, 18]:
             self.add_warning("HEADER", f"Unsupported version", actual=str(self.version))
         else:
@@ -86,6 +243,14 @@ class MapgeoValidator:
     
     def _parse_and_validate_structure(self):
         """Parse and validate the entire structure"""
+        try:
+            self._parse_sections()
+        except _StopParse:
+            # The error explaining why has already been recorded
+            pass
+    
+    def _parse_sections(self):
+        """Walk the file's sections in order"""
         offset = 8  # After header
         
         # Parse sampler defs
@@ -116,34 +281,32 @@ class MapgeoValidator:
     def _parse_sampler_defs(self, offset: int) -> int:
         """Parse sampler definitions"""
         if self.version >= 17:
-            sampler_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+            sampler_count = _U32.unpack_from(self.file_view, offset)[0]
             offset += 4
             self.add_info("SAMPLERS", f"Sampler count: {sampler_count}")
             
             for i in range(sampler_count):
-                sampler_index = struct.unpack('<i', self.file_data[offset:offset+4])[0]
-                offset += 4
-                name_len = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                sampler_name = self.file_data[offset:offset+name_len].decode('utf-8', errors='ignore')
+                sampler_index, name_len = _SAMPLER_HEADER.unpack_from(self.file_view, offset)
+                offset += 8
+                self._check_string_length(name_len, offset, "SAMPLERS", f"Sampler {i} name")
                 offset += name_len
                 
                 if name_len > 1000:
                     self.add_warning("SAMPLERS", f"Sampler {i} has unusually long name: {name_len} bytes")
         elif self.version >= 9:
             # Version 9-16 format
-            name_len = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+            name_len = _U32.unpack_from(self.file_view, offset)[0]
             offset += 4 + name_len
             
             if self.version >= 11:
-                name_len = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+                name_len = _U32.unpack_from(self.file_view, offset)[0]
                 offset += 4 + name_len
         
         return offset
     
     def _parse_vertex_buffer_descriptions(self, offset: int) -> Tuple[int, List]:
         """Parse vertex buffer descriptions"""
-        vb_desc_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+        vb_desc_count = _U32.unpack_from(self.file_view, offset)[0]
         offset += 4
         
         self.add_info("VERTEX_BUFFER_DESC", f"Vertex buffer description count: {vb_desc_count}")
@@ -153,22 +316,22 @@ class MapgeoValidator:
         
         vb_descs = []
         for i in range(vb_desc_count):
-            usage = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-            offset += 4
-            element_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-            offset += 4
-            
-            if element_count > 15:
+            usage, element_count = _U32X2.unpack_from(self.file_view, offset)
+            offset += 8
+            
+            # The element table is always 15 (name, format) pairs, unused ones
+            # included, so read it in one go and keep the used prefix
+            if element_count <= 15:
+                raw = _VB_ELEMENTS.unpack_from(self.file_view, offset)
+                pairs = zip(raw[0:2 * element_count:2], raw[1:2 * element_count:2])
+            else:
                 self.add_error("VERTEX_BUFFER_DESC", f"VB desc {i}: Invalid element count {element_count} (max 15)")
+                pairs = _U32X2.iter_unpack(self.file_view[offset:offset + 8 * element_count])
+            offset += _VB_ELEMENTS.size
             
             elements = []
             current_elem_offset = 0
-            for j in range(element_count):
-                name = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                fmt = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                
+            for j, (name, fmt) in enumerate(pairs):
                 # Validate element name
                 if name > 15:
                     self.add_error("VERTEX_BUFFER_DESC", f"VB desc {i}, element {j}: Invalid name {name} (max 15)")
@@ -178,13 +341,10 @@ class MapgeoValidator:
                     self.add_error("VERTEX_BUFFER_DESC", f"VB desc {i}, element {j}: Invalid format {fmt} (max 12)")
                 
                 # Calculate size
-                elem_size = self._get_format_size(fmt)
+                elem_size = _FORMAT_SIZES[fmt] if fmt < len(_FORMAT_SIZES) else 0
                 elements.append((name, fmt, current_elem_offset, elem_size))
                 current_elem_offset += elem_size
             
-            # Skip padding (unused elements)
-            offset += 8 * (15 - element_count)
-            
             vertex_stride = current_elem_offset
             vb_descs.append({
                 'usage': usage,
@@ -192,32 +352,14 @@ class MapgeoValidator:
                 'stride': vertex_stride
             })
             
-            self.add_info("VERTEX_BUFFER_DESC", f"VB desc {i}: {element_count} elements, stride={vertex_stride} bytes")
+            if self.keep_info:
+                self.add_info("VERTEX_BUFFER_DESC", f"VB desc {i}: {element_count} elements, stride={vertex_stride} bytes")
         
         return offset, vb_descs
     
-    def _get_format_size(self, fmt: int) -> int:
-        """Get size in bytes for a vertex format"""
-        sizes = {
-            0: 4,   # X_FLOAT32
-            1: 8,   # XY_FLOAT32
-            2: 12,  # XYZ_FLOAT32
-            3: 16,  # XYZW_FLOAT32
-            4: 4,   # BGRA_PACKED8888
-            5: 4,   # ZYXW_PACKED8888
-            6: 4,   # RGBA_PACKED8888
-            7: 4,   # XY_PACKED1616
-            8: 8,   # XYZ_PACKED161616
-            9: 8,   # XYZW_PACKED16161616
-            10: 2,  # XY_PACKED88
-            11: 3,  # XYZ_PACKED888
-            12: 4,  # XYZW_PACKED8888
-        }
-        return sizes.get(fmt, 0)
-    
     def _parse_vertex_buffers(self, offset: int, vb_descs: List) -> Tuple[int, List]:
         """Parse vertex buffers"""
-        vb_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+        vb_count = _U32.unpack_from(self.file_view, offset)[0]
         offset += 4
         
         self.add_info("VERTEX_BUFFER", f"Vertex buffer count: {vb_count}")
@@ -228,17 +370,17 @@ class MapgeoValidator:
         vertex_buffers = []
         for i in range(vb_count):
             if self.version >= 13:
-                visibility = struct.unpack('<B', self.file_data[offset:offset+1])[0]
+                visibility = self.file_view[offset]
                 offset += 1
             
-            buffer_size = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+            buffer_size = _U32.unpack_from(self.file_view, offset)[0]
             offset += 4
             
             if buffer_size > len(self.file_data):
                 self.add_error("VERTEX_BUFFER", f"VB {i}: Buffer size {buffer_size} exceeds file size")
                 break
             
-            buffer_data = self.file_data[offset:offset+buffer_size]
+            buffer_data = self.file_view[offset:offset+buffer_size]
             offset += buffer_size
             
             # Calculate vertex count if we have a description
@@ -261,13 +403,14 @@ class MapgeoValidator:
                 'stride': vb_descs[i]['stride'] if i < len(vb_descs) else 0
             })
             
-            self.add_info("VERTEX_BUFFER", f"VB {i}: {buffer_size} bytes, {vertex_count} vertices")
+            if self.keep_info:
+                self.add_info("VERTEX_BUFFER", f"VB {i}: {buffer_size} bytes, {vertex_count} vertices")
         
         return offset, vertex_buffers
     
     def _parse_index_buffers(self, offset: int) -> Tuple[int, List]:
         """Parse index buffers"""
-        ib_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+        ib_count = _U32.unpack_from(self.file_view, offset)[0]
         offset += 4
         
         self.add_info("INDEX_BUFFER", f"Index buffer count: {ib_count}")
@@ -278,17 +421,17 @@ class MapgeoValidator:
         index_buffers = []
         for i in range(ib_count):
             if self.version >= 13:
-                visibility = struct.unpack('<B', self.file_data[offset:offset+1])[0]
+                visibility = self.file_view[offset]
                 offset += 1
             
-            buffer_size = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+            buffer_size = _U32.unpack_from(self.file_view, offset)[0]
             offset += 4
             
             if buffer_size > len(self.file_data):
                 self.add_error("INDEX_BUFFER", f"IB {i}: Buffer size {buffer_size} exceeds file size")
                 break
             
-            buffer_data = self.file_data[offset:offset+buffer_size]
+            buffer_data = self.file_view[offset:offset+buffer_size]
             offset += buffer_size
             
             # Determine format (U16 or U32)
@@ -303,7 +446,7 @@ class MapgeoValidator:
                 self.add_error("INDEX_BUFFER", f"IB {i}: Buffer size {buffer_size} not aligned to U16 or U32")
             
             # Default to U16 (most common)
-            index_buffers.append({
+            ib = {
                 'index': i,
                 'size': buffer_size,
                 'data': buffer_data,
@@ -311,15 +454,21 @@ class MapgeoValidator:
                 'index_count_u32': index_count_u32,
                 'is_u16_aligned': is_u16_aligned,
                 'is_u32_aligned': is_u32_aligned
-            })
+            }
+            # Decode once; meshes sharing this IB reuse the array and its max
+            if NUMPY_AVAILABLE:
+                ib['u16'] = np.frombuffer(buffer_data, dtype='<u2', count=index_count_u16)
+                ib['max_u16'] = int(ib['u16'].max()) if index_count_u16 else 0
+            index_buffers.append(ib)
             
-            self.add_info("INDEX_BUFFER", f"IB {i}: {buffer_size} bytes ({index_count_u16} U16 indices)")
+            if self.keep_info:
+                self.add_info("INDEX_BUFFER", f"IB {i}: {buffer_size} bytes ({index_count_u16} U16 indices)")
         
         return offset, index_buffers
     
     def _parse_and_validate_meshes(self, offset: int, vb_descs: List, vertex_buffers: List, index_buffers: List) -> int:
         """Parse and validate meshes"""
-        mesh_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+        mesh_count = _U32.unpack_from(self.file_view, offset)[0]
         offset += 4
         
         self.add_info("MESH", f"Mesh count: {mesh_count}")
@@ -327,27 +476,29 @@ class MapgeoValidator:
         if mesh_count > 10000:
             self.add_error("MESH", f"Unreasonable mesh count: {mesh_count}")
         
+        layout = self._build_mesh_layout()
+        keep_info = self.keep_info
+        
         for mesh_idx in range(mesh_count):
-            print(f"\n--- Validating Mesh {mesh_idx} ---")
-            
             # Name (version <= 11)
-            if self.version <= 11:
-                name_len = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+            if layout.has_name:
+                name_len = _U32.unpack_from(self.file_view, offset)[0]
                 offset += 4
-                mesh_name = self.file_data[offset:offset+name_len].decode('ascii', errors='ignore')
+                self._check_string_length(name_len, offset, "MESH", f"Mesh {mesh_idx} name", mesh_index=mesh_idx)
+                # Only decoded if the INFO line below is recorded
+                name_start = offset
                 offset += name_len
-            else:
-                mesh_name = f"Mesh_{mesh_idx}"
             
             # Vertex info
-            vertex_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-            offset += 4
-            vertex_decl_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-            offset += 4
-            vertex_decl_id = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-            offset += 4
+            vertex_count, vertex_decl_count, vertex_decl_id = _U32X3.unpack_from(self.file_view, offset)
+            offset += 12
             
-            self.add_info("MESH", f"Mesh {mesh_idx} ({mesh_name}): {vertex_count} vertices, {vertex_decl_count} vertex buffers", mesh_index=mesh_idx)
+            if keep_info:
+                if layout.has_name:
+                    mesh_name = str(self.file_view[name_start:name_start+name_len], 'ascii', errors='ignore')
+                else:
+                    mesh_name = f"Mesh_{mesh_idx}"
+                self.add_info("MESH", f"Mesh {mesh_idx} ({mesh_name}): {vertex_count} vertices, {vertex_decl_count} vertex buffers", mesh_index=mesh_idx)
             
             # Validate vertex declaration
             if vertex_decl_id >= len(vb_descs):
@@ -356,13 +507,12 @@ class MapgeoValidator:
             if vertex_decl_count > 8:
                 self.add_error("MESH", f"Mesh {mesh_idx}: Unreasonable vertex_decl_count {vertex_decl_count}", mesh_index=mesh_idx)
             
-            # Read vertex buffer IDs
-            vb_ids = []
-            for j in range(vertex_decl_count):
-                vb_id = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                vb_ids.append(vb_id)
-                
+            # Vertex buffer IDs followed by index_count and index_buffer_id
+            header_tail = _mesh_header_tail(vertex_decl_count)
+            *vb_ids, index_count, index_buffer_id = header_tail.unpack_from(self.file_view, offset)
+            offset += header_tail.size
+            
+            for vb_id in vb_ids:
                 # Validate VB ID
                 if vb_id >= len(vertex_buffers):
                     self.add_error("MESH", f"Mesh {mesh_idx}: Invalid vertex_buffer_id {vb_id} (max {len(vertex_buffers)-1})", mesh_index=mesh_idx)
@@ -376,13 +526,8 @@ class MapgeoValidator:
                                      expected=str(vertex_count),
                                      actual=str(vb['vertex_count']))
             
-            # Index info
-            index_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-            offset += 4
-            index_buffer_id = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-            offset += 4
-            
-            self.add_info("MESH", f"Mesh {mesh_idx}: {index_count} indices, using IB {index_buffer_id}", mesh_index=mesh_idx)
+            if keep_info:
+                self.add_info("MESH", f"Mesh {mesh_idx}: {index_count} indices, using IB {index_buffer_id}", mesh_index=mesh_idx)
             
             # Validate index buffer
             if index_buffer_id >= len(index_buffers):
@@ -398,50 +543,41 @@ class MapgeoValidator:
                 
                 # Validate indices are within vertex buffer bounds
                 if index_count > 0 and vb_ids:
-                    self._validate_indices(mesh_idx, ib['data'], index_count, vertex_count)
-            
-            # Visibility
-            if self.version >= 13:
-                visibility = struct.unpack('<B', self.file_data[offset:offset+1])[0]
-                offset += 1
-            
-            # Version 18+ unknown
-            if self.version >= 18:
-                unknown_v18 = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
+                    self._validate_indices(mesh_idx, ib, index_count, vertex_count)
             
-            # Version 15+ visibility controller
-            if self.version >= 15:
-                visibility_controller = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
+            # Visibility (13+), unknown u32 (18+) and visibility controller (15+)
+            offset += layout.pre_primitive_skip
             
             # Primitives
-            primitive_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+            primitive_count = _U32.unpack_from(self.file_view, offset)[0]
             offset += 4
             
             if primitive_count > 1000:
                 self.add_warning("MESH", f"Mesh {mesh_idx}: Unusually high primitive count: {primitive_count}", mesh_index=mesh_idx)
             
-            total_prim_indices = 0
-            for prim_idx in range(primitive_count):
-                prim_hash = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                
-                material_len = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                material = self.file_data[offset:offset+material_len].decode('ascii', errors='ignore')
+            # Pass 1: walk the variable-length primitive records, collecting
+            # (start_index, index_count, min_vertex, max_vertex) per primitive
+            prim_ranges = []
+            for _ in range(primitive_count):
+                prim_hash, material_len = _U32X2.unpack_from(self.file_view, offset)
+                offset += 8
+                self._check_string_length(material_len, offset, "MESH", f"Mesh {mesh_idx} primitive material", mesh_index=mesh_idx)
                 offset += material_len
                 
-                start_index = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                prim_index_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                min_vertex = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                max_vertex = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                offset += 4
-                
-                total_prim_indices += prim_index_count
+                prim_ranges.append(_PRIM_RANGE.unpack_from(self.file_view, offset))
+                offset += _PRIM_RANGE.size
+            
+            total_prim_indices = sum(prim_range[1] for prim_range in prim_ranges)
+            
+            # Pass 2: validate all ranges at once; only failing primitives
+            # are inspected again to build their messages
+            bad_prims = [
+                prim_idx for prim_idx, (start_index, prim_index_count, min_vertex, max_vertex) in enumerate(prim_ranges)
+                if (start_index + prim_index_count > index_count or min_vertex >= vertex_count
+                    or max_vertex >= vertex_count or min_vertex > max_vertex)
+            ]
+            for prim_idx in bad_prims:
+                start_index, prim_index_count, min_vertex, max_vertex = prim_ranges[prim_idx]
                 
                 # Validate primitive
                 if start_index + prim_index_count > index_count:
@@ -472,120 +608,147 @@ class MapgeoValidator:
                                mesh_index=mesh_idx)
             
             # Backface culling
-            if self.version != 5:
-                disable_backface = struct.unpack('<?', self.file_data[offset:offset+1])[0]
-                offset += 1
+            offset += layout.backface_skip
             
             # Bounding box
-            bbox_min = struct.unpack('<3f', self.file_data[offset:offset+12])
-            offset += 12
-            bbox_max = struct.unpack('<3f', self.file_data[offset:offset+12])
-            offset += 12
-            
-            # Validate bounding box
-            for axis_idx, axis_name in enumerate(['X', 'Y', 'Z']):
-                if bbox_min[axis_idx] > bbox_max[axis_idx]:
-                    self.add_error("MESH", 
-                                 f"Mesh {mesh_idx}: Bounding box invalid - min_{axis_name} ({bbox_min[axis_idx]:.6f}) > "
-                                 f"max_{axis_name} ({bbox_max[axis_idx]:.6f})",
-                                 mesh_index=mesh_idx)
+            bbox = _F6.unpack_from(self.file_view, offset)
+            offset += 24
+            bbox_min = bbox[:3]
+            bbox_max = bbox[3:]
+            
+            # Validate bounding box; the per-axis checks only run when the
+            # combined check fails (range comparisons are False for NaN)
+            bbox_ok = (all(-1000000 <= val <= 1000000 for val in bbox)
+                       and bbox[0] <= bbox[3] and bbox[1] <= bbox[4] and bbox[2] <= bbox[5])
+            if not bbox_ok:
+                for axis_idx, axis_name in enumerate(['X', 'Y', 'Z']):
+                    if bbox_min[axis_idx] > bbox_max[axis_idx]:
+                        self.add_error("MESH", 
+                                     f"Mesh {mesh_idx}: Bounding box invalid - min_{axis_name} ({bbox_min[axis_idx]:.6f}) > "
+                                     f"max_{axis_name} ({bbox_max[axis_idx]:.6f})",
+                                     mesh_index=mesh_idx)
                 
-                # Check for extreme values
-                for val, label in [(bbox_min[axis_idx], f"min_{axis_name}"), (bbox_max[axis_idx], f"max_{axis_name}")]:
-                    if abs(val) > 1000000:
-                        self.add_warning("MESH", 
-                                       f"Mesh {mesh_idx}: Bounding box {label} has extreme value: {val:.6f}",
-                                       mesh_index=mesh_idx)
+                    # Check for extreme values
+                    for val, label in [(bbox_min[axis_idx], f"min_{axis_name}"), (bbox_max[axis_idx], f"max_{axis_name}")]:
+                        if abs(val) > 1000000:
+                            self.add_warning("MESH", 
+                                           f"Mesh {mesh_idx}: Bounding box {label} has extreme value: {val:.6f}",
+                                           mesh_index=mesh_idx)
                     
-                    # Check for NaN or Inf
-                    if val != val:  # NaN check
-                        self.add_error("MESH", f"Mesh {mesh_idx}: Bounding box {label} is NaN", mesh_index=mesh_idx)
-                    elif abs(val) == float('inf'):
-                        self.add_error("MESH", f"Mesh {mesh_idx}: Bounding box {label} is Inf", mesh_index=mesh_idx)
+                        # Check for NaN or Inf
+                        if val != val:  # NaN check
+                            self.add_error("MESH", f"Mesh {mesh_idx}: Bounding box {label} is NaN", mesh_index=mesh_idx)
+                        elif abs(val) == float('inf'):
+                            self.add_error("MESH", f"Mesh {mesh_idx}: Bounding box {label} is Inf", mesh_index=mesh_idx)
             
             # Transform matrix
-            transform = struct.unpack('<16f', self.file_data[offset:offset+64])
+            transform = _F16.unpack_from(self.file_view, offset)
             offset += 64
             
             # Validate transform (check for NaN/Inf)
-            for i, val in enumerate(transform):
-                if val != val:  # NaN
-                    self.add_error("MESH", f"Mesh {mesh_idx}: Transform matrix element {i} is NaN", mesh_index=mesh_idx)
-                elif abs(val) == float('inf'):
-                    self.add_error("MESH", f"Mesh {mesh_idx}: Transform matrix element {i} is Inf", mesh_index=mesh_idx)
+            if not all(map(math.isfinite, transform)):
+                for i, val in enumerate(transform):
+                    if val != val:  # NaN
+                        self.add_error("MESH", f"Mesh {mesh_idx}: Transform matrix element {i} is NaN", mesh_index=mesh_idx)
+                    elif abs(val) == float('inf'):
+                        self.add_error("MESH", f"Mesh {mesh_idx}: Transform matrix element {i} is Inf", mesh_index=mesh_idx)
             
             # Quality
-            quality = struct.unpack('<B', self.file_data[offset:offset+1])[0]
+            quality = self.file_view[offset]
             offset += 1
             
             if quality > 4:
                 self.add_error("MESH", f"Mesh {mesh_idx}: Invalid quality value {quality} (max 4)", mesh_index=mesh_idx)
             
-            # Version-specific fields
-            if self.version >= 7 and self.version <= 12:
-                visibility = struct.unpack('<B', self.file_data[offset:offset+1])[0]
-                offset += 1
-            
-            if self.version >= 11 and self.version < 14:
-                render_flags = struct.unpack('<B', self.file_data[offset:offset+1])[0]
-                offset += 1
-            elif self.version >= 14:
-                layer_transition = struct.unpack('<B', self.file_data[offset:offset+1])[0]
-                offset += 1
-                if self.version < 16:
-                    render_flags = struct.unpack('<B', self.file_data[offset:offset+1])[0]
-                    offset += 1
-                else:
-                    render_flags = struct.unpack('<H', self.file_data[offset:offset+2])[0]
-                    offset += 2
+            # Version-specific visibility / render flag / layer transition bytes
+            offset += layout.post_quality_skip
             
             # Light channels
-            if self.version < 9:
-                offset += 9 * 12  # Skip spherical harmonics
+            offset += layout.sh_skip  # Spherical harmonics (< 9)
+            for _ in range(layout.light_channel_count):
                 offset = self._skip_light_channel(offset)
-            else:
-                offset = self._skip_light_channel(offset)  # Baked light
-                offset = self._skip_light_channel(offset)  # Stationary light
-                
-                if self.version >= 12 and self.version < 17:
-                    offset = self._skip_light_channel(offset)  # Baked paint
+            
+            if layout.has_texture_overrides:
+                # Texture overrides
+                override_count = _U32.unpack_from(self.file_view, offset)[0]
+                offset += 4
+                for _ in range(override_count):
+                    override_index, override_len = _U32X2.unpack_from(self.file_view, offset)
+                    offset += 8 + override_len
                 
-                if self.version >= 17:
-                    # Texture overrides
-                    override_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                    offset += 4
-                    for _ in range(override_count):
-                        override_index = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                        offset += 4
-                        override_len = struct.unpack('<I', self.file_data[offset:offset+4])[0]
-                        offset += 4
-                        offset += override_len
-                    
-                    # Baked paint scale and bias
-                    offset += 16
+                # Baked paint scale and bias
+                offset += 16
         
         return offset
     
-    def _validate_indices(self, mesh_idx: int, index_data: bytes, index_count: int, vertex_count: int):
+    def _build_mesh_layout(self) -> "_MeshLayout":
+        """Resolve the version-dependent parts of a mesh record once per file
+        
+        Fields the validator never inspects are collapsed into byte counts to
+        skip, so the per-mesh loop does no version comparisons.
+        """
+        v = self.version
+        
+        if 7 <= v <= 12:
+            post_quality_skip = 1  # visibility
+        else:
+            post_quality_skip = 0
+        if 11 <= v < 14:
+            post_quality_skip += 1  # render_flags
+        elif v >= 14:
+            post_quality_skip += 1 + (1 if v < 16 else 2)  # layer_transition + render_flags
+        
+        if v < 9:
+            light_channel_count = 1
+        else:
+            # Baked light, stationary light (+ baked paint for 12-16)
+            light_channel_count = 3 if 12 <= v < 17 else 2
+        
+        return _MeshLayout(
+            has_name=v <= 11,
+            pre_primitive_skip=(1 if v >= 13 else 0) + (4 if v >= 18 else 0) + (4 if v >= 15 else 0),
+            backface_skip=1 if v != 5 else 0,
+            post_quality_skip=post_quality_skip,
+            sh_skip=9 * 12 if v < 9 else 0,
+            light_channel_count=light_channel_count,
+            has_texture_overrides=v >= 17,
+        )
+    
+    def _validate_indices(self, mesh_idx: int, ib: Dict, index_count: int, vertex_count: int):
         """Validate that all indices are within vertex buffer bounds"""
         # Assume U16 format (most common)
-        for i in range(index_count):
-            if i * 2 + 2 > len(index_data):
+        index_data = ib['data']
+        count = min(index_count, ib['index_count_u16'])
+        if NUMPY_AVAILABLE:
+            if count == 0 or ib['max_u16'] < vertex_count:
+                return
+            # Meshes always check a prefix of their IB, so a running maximum
+            # (built once per IB, on first need) answers each query in O(1)
+            prefix_max = ib.get('prefix_max')
+            if prefix_max is None:
+                prefix_max = ib['prefix_max'] = np.maximum.accumulate(ib['u16'])
+            if int(prefix_max[count - 1]) < vertex_count:
+                return
+            bad_positions = np.flatnonzero(ib['u16'][:count] >= vertex_count).tolist()
+        else:
+            bad_positions = (
+                i for i, (idx,) in enumerate(_U16.iter_unpack(index_data[:count * 2]))
+                if idx >= vertex_count
+            )
+        
+        for i in bad_positions:
+            idx = _U16.unpack_from(index_data, i * 2)[0]
+            self.add_error("MESH", 
+                         f"Mesh {mesh_idx}: Index [{i}] = {idx} is out of bounds (vertex_count = {vertex_count})",
+                         mesh_index=mesh_idx)
+            # Only report first few out-of-bounds indices to avoid spam
+            if i > 10:
+                self.add_warning("MESH", f"Mesh {mesh_idx}: Additional out-of-bounds indices not shown...", mesh_index=mesh_idx)
                 break
-            
-            idx = struct.unpack('<H', index_data[i*2:i*2+2])[0]
-            if idx >= vertex_count:
-                self.add_error("MESH", 
-                             f"Mesh {mesh_idx}: Index [{i}] = {idx} is out of bounds (vertex_count = {vertex_count})",
-                             mesh_index=mesh_idx)
-                # Only report first few out-of-bounds indices to avoid spam
-                if i > 10:
-                    self.add_warning("MESH", f"Mesh {mesh_idx}: Additional out-of-bounds indices not shown...", mesh_index=mesh_idx)
-                    break
     
     def _skip_light_channel(self, offset: int) -> int:
         """Skip a light channel in the file"""
-        tex_len = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+        tex_len = _U32.unpack_from(self.file_view, offset)[0]
         offset += 4
         offset += tex_len
         offset += 16  # scale + bias (4 floats)
@@ -595,7 +758,7 @@ class MapgeoValidator:
         """Parse bucket grids"""
         try:
             if self.version >= 15:
-                grid_count = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+                grid_count = _U32.unpack_from(self.file_view, offset)[0]
                 offset += 4
             else:
                 grid_count = 1
@@ -604,28 +767,20 @@ class MapgeoValidator:
             
             for grid_idx in range(grid_count):
                 if self.version >= 15:
-                    path_hash = struct.unpack('<I', self.file_data[offset:offset+4])[0]
+                    path_hash = _U32.unpack_from(self.file_view, offset)[0]
                     offset += 4
                 
                 if self.version >= 18:
-                    unknown_float = struct.unpack('<f', self.file_data[offset:offset+4])[0]
+                    unknown_float = _F32.unpack_from(self.file_view, offset)[0]
                     offset += 4
                 
-                min_x, min_z, max_x, max_z = struct.unpack('<4f', self.file_data[offset:offset+16])
-                offset += 16
-                max_stickout_x, max_stickout_z = struct.unpack('<2f', self.file_data[offset:offset+8])
-                offset += 8
-                bucket_size_x, bucket_size_z = struct.unpack('<2f', self.file_data[offset:offset+8])
-                offset += 8
-                
-                buckets_per_side = struct.unpack('<H', self.file_data[offset:offset+2])[0]
-                offset += 2
-                is_disabled = struct.unpack('<?', self.file_data[offset:offset+1])[0]
-                offset += 1
-                flags = struct.unpack('<B', self.file_data[offset:offset+1])[0]
-                offset += 1
+                (min_x, min_z, max_x, max_z,
+                 max_stickout_x, max_stickout_z,
+                 bucket_size_x, bucket_size_z,
+                 buckets_per_side, is_disabled, flags) = _BUCKET_GRID_HEADER.unpack_from(self.file_view, offset)
+                offset += _BUCKET_GRID_HEADER.size
                 
-                vertex_count, index_count = struct.unpack('<2I', self.file_data[offset:offset+8])
+                vertex_count, index_count = _U32X2.unpack_from(self.file_view, offset)
                 offset += 8
                 
                 self.add_info("BUCKET_GRID", 
@@ -661,60 +816,89 @@ class MapgeoValidator:
         
         return offset
     
-    def print_report(self):
-        """Print validation report"""
-        print("\n" + "="*80)
-        print("VALIDATION REPORT")
-        print("="*80 + "\n")
-        
-        error_count = sum(1 for issue in self.issues if issue.severity == "ERROR")
-        warning_count = sum(1 for issue in self.issues if issue.severity == "WARNING")
-        info_count = sum(1 for issue in self.issues if issue.severity == "INFO")
-        
-        print(f"Total Issues: {len(self.issues)}")
-        print(f"  Errors: {error_count}")
-        print(f"  Warnings: {warning_count}")
-        print(f"  Info: {info_count}\n")
+    def _bucket_issues(self) -> Tuple[Dict[str, List[ValidationIssue]], Dict[str, int]]:
+        """Bucket issues by severity and count occurrences in one pass"""
+        buckets = {"ERROR": [], "WARNING": [], "INFO": []}
+        counts = {"ERROR": 0, "WARNING": 0, "INFO": 0}
+        for issue in self.issues:
+            buckets[issue.severity].append(issue)
+            counts[issue.severity] += issue.count
+        return buckets, counts
+    
+    def iter_report_lines(self) -> Iterator[str]:
+        """Yield the validation report line by line"""
+        yield "\n" + "="*80
+        yield "VALIDATION REPORT"
+        yield "="*80 + "\n"
+        
+        buckets, counts = self._bucket_issues()
+        error_count = counts["ERROR"]
+        warning_count = counts["WARNING"]
+        info_count = counts["INFO"]
+        
+        yield f"Total Issues: {error_count + warning_count + info_count}"
+        yield f"  Errors: {error_count}"
+        yield f"  Warnings: {warning_count}"
+        yield f"  Info: {info_count}\n"
         
         # Group by severity
-        for severity in ["ERROR", "WARNING", "INFO"]:
-            severity_issues = [i for i in self.issues if i.severity == severity]
+        for severity in ("ERROR", "WARNING", "INFO"):
+            severity_issues = buckets[severity]
             if not severity_issues:
                 continue
             
-            print(f"\n{severity}S ({len(severity_issues)}):")
-            print("-" * 80)
+            yield f"\n{severity}S ({counts[severity]}):"
+            yield "-" * 80
             
             for issue in severity_issues:
-                prefix = f"[{issue.category}]"
-                if issue.mesh_index >= 0:
-                    prefix += f" Mesh {issue.mesh_index}:"
-                
-                print(f"{prefix} {issue.message}")
-                
-                if issue.expected:
-                    print(f"  Expected: {issue.expected}")
-                if issue.actual:
-                    print(f"  Actual: {issue.actual}")
-                if issue.offset >= 0:
-                    print(f"  Offset: 0x{issue.offset:08X}")
-        
-        print("\n" + "="*80)
+                if issue.count > 1:
+                    # The count goes after the message line, before any detail lines
+                    first, sep, details = issue.rendered.partition("\n")
+                    yield f"{first} (×{issue.count}){sep}{details}"
+                else:
+                    yield issue.rendered
+        
+        yield "\n" + "="*80
         if error_count > 0:
-            print("RESULT: VALIDATION FAILED - File has critical errors that likely cause crashes")
+            yield "RESULT: VALIDATION FAILED - File has critical errors that likely cause crashes"
         elif warning_count > 0:
-            print("RESULT: VALIDATION PASSED WITH WARNINGS - File may have issues")
+            yield "RESULT: VALIDATION PASSED WITH WARNINGS - File may have issues"
         else:
-            print("RESULT: VALIDATION PASSED - No issues detected")
-        print("="*80 + "\n")
+            yield "RESULT: VALIDATION PASSED - No issues detected"
+        yield "="*80 + "\n"
+    
+    def print_report(self, quiet: bool = False):
+        """Print validation report; with quiet, a file without errors only gets the RESULT line"""
+        if quiet:
+            counts = self._bucket_issues()[1]
+            if counts["ERROR"] == 0:
+                if counts["WARNING"] > 0:
+                    print("RESULT: VALIDATION PASSED WITH WARNINGS - File may have issues")
+                else:
+                    print("RESULT: VALIDATION PASSED - No issues detected")
+                return
+        
+        # Write in blocks of lines rather than one print per line, without
+        # holding the whole formatted report in memory
+        lines = self.iter_report_lines()
+        while True:
+            block = list(itertools.islice(lines, _REPORT_WRITE_BLOCK))
+            if not block:
+                break
+            sys.stdout.write("\n".join(block))
+            sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python validate_mapgeo.py <path_to_mapgeo_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Validate a mapgeo file's structure and data integrity")
+    parser.add_argument("filepath", help="path to the .mapgeo file")
+    parser.add_argument("--verbosity", choices=_VERBOSITY_LEVELS, default='info',
+                        help="lowest severity to record (default: info)")
+    parser.add_argument("-q", "--quiet", action="store_true",
+                        help="only print the RESULT line unless there are errors")
+    args = parser.parse_args()
     
-    filepath = sys.argv[1]
-    validator = MapgeoValidator(filepath)
-    validator.validate()
-    validator.print_report()
+    validator = MapgeoValidator(args.filepath, verbosity=args.verbosity)
+    issues = validator.validate()
+    validator.print_report(quiet=args.quiet)
+    sys.exit(1 if any(issue.severity == "ERROR" for issue in issues) else 0)